@@ -0,0 +1,411 @@
+# Benchmark + equivalence check: vectorized engine vs. the legacy nested record loops
+#
+#   python bench_engine.py
+#
+# Also times 60–360 month horizons with every duration selected and a
+# 500-scenario batched sweep, a process-pool sweep at several worker counts and
+# the streaming Excel export, the rollup cube's breakdowns and chart rendering.
+# The asserts here only guard the large timed configs; the fast correctness
+# suite is in tests/ (python -m pytest -q).
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from rosca import COMMITTEE, LIFECYCLE, ForecastConfig, ResultCache, run_forecast
+from rosca.engine import SUMMARY_COLUMNS
+from rosca.scenarios import run_scenarios
+from rosca.montecarlo import simulate_defaults
+from rosca.rollup import RollupCube
+from rosca.schema import compact_frame, footprint
+from rosca.sweep import expand_grid, run_sweep
+
+SLABS = [1000, 2000, 5000, 10000, 15000, 20000, 25000, 50000]
+DURATIONS = list(range(2, 11))
+
+
+def full_config():
+    """All durations 2–10, all 8 slabs, a few blocked slots."""
+    duration_alloc = {d: (100 // len(DURATIONS)) + (100 % len(DURATIONS) if i == 0 else 0)
+                      for i, d in enumerate(DURATIONS)}
+    slab_alloc = {d: dict(zip(SLABS, [20, 20, 15, 15, 10, 10, 5, 5])) for d in DURATIONS}
+    slot_fees = {d: {s: max(0, 11 - s) for s in range(1, d + 1)} for d in DURATIONS}
+    slot_blocked = {d: {s: (s == d and d % 3 == 0) for s in range(1, d + 1)} for d in DURATIONS}
+    return dict(
+        tam=2000000, start_users=200000, monthly_growth=2.0, yearly_growth=5.0,
+        rest_period=1, durations=DURATIONS, slabs=SLABS, duration_alloc=duration_alloc,
+        slab_alloc=slab_alloc, slot_fees=slot_fees, slot_blocked=slot_blocked,
+        kibor=11.0, spread=5.0, default_rate=1.0, fee_upfront=True, default_fee_pct=10.0,
+    )
+
+
+# --- Legacy loops, copied from the apps ---
+def legacy_committee(tam, start_users, monthly_growth, yearly_growth, rest_period, durations, slabs,
+                     duration_alloc, slab_alloc, slot_fees, slot_blocked, kibor, spread, default_rate,
+                     fee_upfront, **_):
+    rejoin_schedule = [0] * 120
+    records = []
+    current_users = start_users
+    used_users = 0
+    for m in range(1, 61):
+        rejoining = rejoin_schedule[m]
+        growth_users = current_users * (monthly_growth / 100)
+        if m in [13, 25, 37, 49]:
+            growth_users += tam * (yearly_growth / 100)
+        if used_users + growth_users > tam:
+            growth_users = max(0, tam - used_users)
+        current_users = growth_users + rejoining
+        used_users += growth_users
+        if current_users < 0:
+            current_users = 0
+        for d in durations:
+            if duration_alloc[d] == 0: continue
+            users_d = current_users * (duration_alloc[d] / 100)
+            for slab in slabs:
+                if slab_alloc[d][slab] == 0: continue
+                slab_users = users_d * (slab_alloc[d][slab] / 100)
+                users_per_slot = slab_users
+                if m + d + rest_period < len(rejoin_schedule):
+                    rejoin_schedule[m + d + rest_period] += slab_users
+                for slot in range(1, d + 1):
+                    if slot_blocked[d][slot]:
+                        users = deposit = fee_col = nii = profit = fee = 0
+                    else:
+                        users = users_per_slot
+                        deposit = users * slab * d
+                        fee = slot_fees[d][slot]
+                        fee_col = deposit * (fee / 100) if fee_upfront else 0
+                        nii = deposit * ((kibor + spread) / 100 / 12)
+                        profit = fee_col + nii - (deposit * default_rate / 100)
+                    records.append({
+                        "Month": m, "Year": (m - 1) // 12 + 1,
+                        "Duration": d, "Slab": slab, "Slot": slot,
+                        "New Users": growth_users if slot == 1 and slab == slabs[0] else 0,
+                        "Rejoining Users": rejoining if slot == 1 and slab == slabs[0] else 0,
+                        "Active Users": users,
+                        "Deposit": deposit, "Fee %": fee,
+                        "Fee Collected": fee_col, "NII": nii, "Profit": profit,
+                        "Blocked": slot_blocked[d][slot]
+                    })
+    return pd.DataFrame(records)
+
+
+def legacy_lifecycle(tam, start_users, monthly_growth, yearly_growth, rest_period, durations, slabs,
+                     duration_alloc, slab_alloc, slot_fees, slot_blocked, kibor, spread, default_rate,
+                     fee_upfront, default_fee_pct, **_):
+    records, rejoin_schedule = [], [0] * 120
+    current_users = start_users
+    total_users_used = start_users
+    for m in range(1, 61):
+        year_bump = tam * (yearly_growth / 100) if m in [13, 25, 37, 49] else 0
+        growth_users = current_users * (monthly_growth / 100)
+        if total_users_used + growth_users + year_bump > tam:
+            growth_users = max(0, tam - total_users_used)
+        total_users_used += growth_users + year_bump
+        rejoining = rejoin_schedule[m]
+        active_users = growth_users + rejoining
+        for d in durations:
+            if duration_alloc[d] == 0: continue
+            users_d = active_users * (duration_alloc[d] / 100)
+            for slab in slabs:
+                if slab_alloc[d][slab] == 0: continue
+                users_slab = users_d * (slab_alloc[d][slab] / 100)
+                if m + d + rest_period < len(rejoin_schedule):
+                    rejoin_schedule[m + d + rest_period] += users_slab
+                for slot in range(1, d + 1):
+                    if slot_blocked[d][slot]:
+                        # the app leaves `loss` from the previous row here; the engine reports 0
+                        u = deposit = fee_col = nii = profit = payout = refund = fee = loss = 0
+                        state = "Blocked"
+                    else:
+                        u = users_slab
+                        fee = slot_fees[d][slot]
+                        deposit = u * slab * d
+                        payout = u * slab
+                        fee_col = deposit * (fee / 100) if fee_upfront else payout * (fee / 100)
+                        nii = deposit * ((kibor + spread) / 100 / 12)
+                        loss = (payout * default_rate / 100)
+                        refund = deposit * (1 - default_fee_pct / 100) if m % d < 2 else 0
+                        profit = fee_col + nii - loss
+                        state = "Active"
+                    records.append({
+                        "Month": m, "Year": (m - 1) // 12 + 1,
+                        "Duration": d, "Slab": slab, "Slot": slot,
+                        "New Users": growth_users if slot == 1 and slab == slabs[0] else 0,
+                        "Rejoining Users": rejoining if slot == 1 and slab == slabs[0] else 0,
+                        "State": state,
+                        "Users": u, "Deposit": deposit,
+                        "Payout": payout, "Fee %": fee,
+                        "Fee Collected": fee_col, "NII": nii,
+                        "Loss from Default": loss, "Refund": refund,
+                        "Profit": profit
+                    })
+    return pd.DataFrame(records)
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def check_equal(expected, actual):
+    assert list(expected.columns) == list(actual.columns), (expected.columns, actual.columns)
+    assert len(expected) == len(actual), (len(expected), len(actual))
+    for col in expected.columns:
+        e, a = expected[col].to_numpy(), actual[col].to_numpy()
+        if e.dtype.kind in "fiu" and a.dtype.kind in "fiu":
+            np.testing.assert_allclose(a.astype(float), e.astype(float), rtol=1e-12, atol=1e-6, err_msg=col)
+        else:
+            assert (e.astype(str) == a.astype(str)).all(), col
+
+
+def main():
+    cfg = full_config()
+    for model, legacy in ((COMMITTEE, legacy_committee), (LIFECYCLE, legacy_lifecycle)):
+        expected = legacy(**cfg)
+        forecast = run_forecast(model=model, **cfg)
+        check_equal(expected, forecast.to_frame())
+        summary_cols = list(SUMMARY_COLUMNS[model])
+        for key, summary in (("Month", forecast.monthly()), ("Year", forecast.yearly())):
+            check_equal(expected.groupby(key)[summary_cols].sum().reset_index(), summary)
+
+        t_legacy = best_of(lambda: legacy(**cfg), repeat=3)
+        t_summary = best_of(lambda: run_forecast(model=model, **cfg).monthly_totals())
+        t_kernel = best_of(lambda: run_forecast(model=model, **cfg).broadcast_columns())
+        t_frame = best_of(lambda: run_forecast(model=model, **cfg).to_frame())
+        print(f"{model:<10} rows={len(expected):>6}  legacy={t_legacy * 1e3:8.1f} ms  "
+              f"summary-only={t_summary * 1e3:6.2f} ms ({t_legacy / t_summary:5.0f}x)  "
+              f"kernel={t_kernel * 1e3:6.2f} ms ({t_legacy / t_kernel:5.0f}x)  "
+              f"kernel+frame={t_frame * 1e3:6.2f} ms ({t_legacy / t_frame:4.0f}x)")
+
+
+def bench_horizon():
+    """Runtime vs. horizon for the full config – should grow linearly in months."""
+    cfg = full_config()
+    for months in (60, 120, 240, 360):
+        t_summary = best_of(lambda: run_forecast(months=months, **cfg).yearly())
+        t_frame = best_of(lambda: run_forecast(months=months, **cfg).to_frame())
+        rows = run_forecast(months=months, **cfg).n_rows
+        print(f"horizon={months:>3}  rows={rows:>7}  summaries={t_summary * 1e3:6.2f} ms  "
+              f"slot-level table={t_frame * 1e3:7.2f} ms")
+    assert t_frame < 1.0, "360-month run with all durations should stay under a second"
+
+
+def bench_scenarios(n=500):
+    """A batched sweep vs. one single run; spot-checks scenarios against run_forecast."""
+    cfg = full_config()
+    rng = np.random.default_rng(0)
+    sweep = dict(
+        kibor=rng.uniform(8, 20, n), spread=rng.uniform(2, 8, n), default_rate=rng.uniform(0, 5, n),
+        monthly_growth=rng.uniform(0, 6, n), rest_period=rng.integers(0, 6, n).tolist(),
+    )
+    shared = {k: v for k, v in cfg.items() if k not in sweep}
+    for model in (COMMITTEE, LIFECYCLE):
+        cube = run_scenarios(model=model, **sweep, **shared)
+        for i in (0, n // 2, n - 1):
+            single = run_forecast(model=model, **{k: v[i] for k, v in sweep.items()}, **shared)
+            np.testing.assert_allclose(cube["Profit"][i], single.monthly_totals()["Profit"], rtol=1e-9)
+        t_batch = best_of(lambda: run_scenarios(model=model, **sweep, **shared))
+        t_single = best_of(lambda: run_forecast(model=model, **cfg).monthly_totals())
+        print(f"{model:<10} {n} scenarios={t_batch * 1e3:6.2f} ms  single run={t_single * 1e3:5.2f} ms "
+              f"(batch ≈ {t_batch / t_single:.0f} single runs)")
+
+
+def bench_sweep():
+    """Process-pool sweep over slab mixes × rates × models at 1, 2 and 4 workers."""
+    import os
+
+    cfg = full_config()
+    mixes = [[20, 20, 15, 15, 10, 10, 5, 5], [50, 50, 0, 0, 0, 0, 0, 0], [0] * 7 + [100]]
+    grid = expand_grid(
+        cfg,
+        slab_alloc=[{d: dict(zip(SLABS, mix)) for d in DURATIONS} for mix in mixes],
+        kibor=[10, 12, 14, 16], default_rate=[0.5, 1, 2, 3], model=[COMMITTEE, LIFECYCLE],
+    )
+    inline = run_sweep(grid, workers=0)
+    for workers in (1, 2, 4):
+        t0 = time.perf_counter()
+        cube = run_sweep(grid, workers=workers, chunk_size=8)
+        elapsed = time.perf_counter() - t0
+        np.testing.assert_array_equal(cube.values, inline.values)
+        print(f"sweep {len(grid)} configs  workers={workers}  {elapsed * 1e3:7.1f} ms  (cpus={os.cpu_count()})")
+
+
+def bench_montecarlo(paths=10000):
+    """10k-path default simulation; the mean loss must track the deterministic one."""
+    for model in (COMMITTEE, LIFECYCLE):
+        forecast = run_forecast(model=model, **full_config())
+        expected = forecast.monthly_totals()["Loss from Default"]
+        for workers in (0, 4):
+            t0 = time.perf_counter()
+            sim = simulate_defaults(forecast, paths=paths, seed=7, workers=workers)
+            elapsed = time.perf_counter() - t0
+            np.testing.assert_allclose(sim.loss.mean(axis=0), expected, rtol=0.02)
+            print(f"monte carlo {model:9s} {paths} paths  workers={workers}  {elapsed:6.2f} s")
+
+    # Streaming statistics only: peak memory must not grow with the path count
+    import tracemalloc
+
+    peaks = []
+    for n in (paths // 5, paths * 2):
+        tracemalloc.start()
+        streamed = simulate_defaults(forecast, paths=n, seed=7, keep_paths=False)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < peaks[0] * 1.2, peaks
+    spread = (sim.bands("Profit") - streamed.bands("Profit")).abs().max()
+    print(f"monte carlo streaming {n} paths  peak {peaks[1] / 1e6:.1f} MB (vs {peaks[0] / 1e6:.1f} MB at {paths // 5})"
+          f"  max P5/P50/P95 gap vs exact {spread.drop('Month').max():,.0f}")
+
+
+def bench_slot_edits():
+    """Patching slot fees / blocks must match a full rerun and cost a fraction of it."""
+    cfg = full_config()
+    for model in (COMMITTEE, LIFECYCLE):
+        forecast = run_forecast(model=model, **cfg)
+        forecast.monthly_totals()
+        fees = {d: dict(slots) for d, slots in cfg["slot_fees"].items()}
+        blocked = {d: dict(slots) for d, slots in cfg["slot_blocked"].items()}
+        fees[6][2], blocked[4][1], blocked[10][10] = 7.5, True, not blocked[10][10]
+        patched = forecast.update_slots(
+            slot_fees={6: {2: 7.5}}, slot_blocked={4: {1: True}, 10: {10: blocked[10][10]}},
+        )
+        expected = run_forecast(model=model, **dict(cfg, slot_fees=fees, slot_blocked=blocked))
+        for name, values in expected.monthly_totals().items():
+            np.testing.assert_allclose(patched.monthly_totals()[name], values, rtol=1e-12)
+        t_delta = best_of(lambda: forecast.update_slots(slot_blocked={4: {1: True}}).monthly_totals())
+        t_full = best_of(lambda: run_forecast(model=model, **cfg).monthly_totals())
+        print(f"slot edit {model:9s}  delta {t_delta * 1e3:6.2f} ms  full rerun {t_full * 1e3:6.2f} ms")
+
+
+def bench_disk_cache():
+    """Reloading a stored 360-month forecast vs recomputing it."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        for model in (COMMITTEE, LIFECYCLE):
+            config = ForecastConfig(**dict(full_config(), months=360, model=model))
+            cache = ResultCache(directory)
+            computed = cache.get_or_compute(config, lambda: run_forecast(**config))
+            pd.testing.assert_frame_equal(cache.load(config).monthly(), computed.monthly())
+            t_load = best_of(lambda: cache.load(config).monthly())
+            t_run = best_of(lambda: run_forecast(**config).monthly())
+            print(f"disk cache {model:9s}  load {t_load * 1e3:6.2f} ms  recompute {t_run * 1e3:6.2f} ms  {cache.stats()}")
+
+
+def bench_schema():
+    """Memory and groupby time of a legacy record-loop table before and after compact_frame."""
+    cfg = full_config()
+    for model, legacy in ((COMMITTEE, legacy_committee), (LIFECYCLE, legacy_lifecycle)):
+        wide = legacy(**cfg)
+        compact = compact_frame(wide)
+        check_equal(wide, compact)
+        assert footprint(compact).sum() < footprint(wide).sum()
+        engine = run_forecast(model=model, **cfg)
+        assert engine.table_nbytes <= footprint(engine.to_frame()).sum()
+        times = [
+            best_of(lambda: frame.groupby(["Year", "Duration", "Slot"], observed=True)[["Profit"]].sum())
+            for frame in (wide, compact)
+        ]
+        print(f"schema {model:9s}  legacy {footprint(wide).sum() / 1e6:5.2f} MB  compact "
+              f"{footprint(compact).sum() / 1e6:5.2f} MB  engine table {engine.table_nbytes / 1e6:5.2f} MB  "
+              f"groupby {times[0] * 1e3:5.2f} -> {times[1] * 1e3:5.2f} ms")
+
+
+def bench_rollup():
+    """Breakdowns off the rollup cube vs groupby over the 360-month slot table."""
+    for model in (COMMITTEE, LIFECYCLE):
+        forecast = run_forecast(**dict(full_config(), months=360, model=model))
+        table = forecast.to_frame()
+        cube = RollupCube.from_forecast(forecast)
+        metrics = list(cube.metrics)
+        for by in (("Month",), ("Year",), ("Year", "Duration"), ("Month", "Slab", "Slot")):
+            expected = table.groupby(list(by), observed=True)[metrics].sum().reset_index()
+            # Both list exactly the combinations present in the table
+            breakdown = cube.frame(by)
+            assert len(breakdown) == len(expected), (by, len(breakdown), len(expected))
+            merged = breakdown.merge(expected, on=list(by), suffixes=("", " expected"), how="left")
+            for name in metrics:
+                np.testing.assert_allclose(merged[name], merged[f"{name} expected"], rtol=1e-9, atol=1e-6, err_msg=name)
+
+        t_build = best_of(lambda: RollupCube.from_forecast(forecast), repeat=3)
+        t_cube = best_of(lambda: (cube.frame(("Month",)), cube.frame(("Year",)), cube.frame(("Year", "Duration"))))
+        t_groupby = best_of(lambda: [table.groupby(key, observed=True)[metrics].sum() for key in ("Month", "Year", ["Year", "Duration"])])
+        print(f"rollup {model:9s}  cube {cube.nbytes / 1e6:5.1f} MB built in {t_build * 1e3:6.1f} ms  "
+              f"3 breakdowns {t_cube * 1e3:5.2f} ms  groupby {t_groupby * 1e3:6.1f} ms")
+
+
+def bench_charts(n=100_000):
+    """LTTB keeps a long series' spikes; rendering leaves no figure behind."""
+    import matplotlib.pyplot as plt
+
+    from rosca.charts import line_chart_png, lttb
+
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=n))
+    peak, trough = n // 3, 2 * n // 3
+    y[peak], y[trough] = y.max() * 10, y.min() * 10
+    keep = lttb(np.arange(n), y, 640)
+    assert keep.size == 640 and peak in keep and trough in keep, (peak, trough)
+    t_png = best_of(lambda: line_chart_png(np.arange(n), y), repeat=3)
+    assert not plt.get_fignums()
+    print(f"charts {n} points -> {keep.size}  png {t_png * 1e3:6.1f} ms")
+
+
+def bench_export():
+    """Streaming the 360-month slot table to xlsx vs pandas and to Parquet / Feather.
+
+    Peak memory of the xlsx stream must not grow with the row count.
+    """
+    import tempfile
+    import tracemalloc
+
+    from rosca.export import COLUMNAR_FORMATS, write_tables, write_workbook
+
+    table = run_forecast(**dict(full_config(), months=360)).to_frame()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "forecast.xlsx")
+        t0 = time.perf_counter()
+        table.to_excel(path, sheet_name="Forecast", index=False)
+        t_pandas = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        written = write_workbook(path, {"Forecast": table})
+        t_stream = time.perf_counter() - t0
+        assert written == {"Forecast": len(table)}, written
+        print(f"excel export {len(table)} rows  stream {t_stream:6.2f} s  pandas {t_pandas:6.2f} s")
+        for fmt in COLUMNAR_FORMATS:
+            t_columnar = best_of(lambda: write_tables(directory, {"Forecast": table}, fmt), repeat=3)
+            print(f"{fmt} export {len(table)} rows  {t_columnar:6.2f} s")
+
+        # A small row limit forces the sheet split without writing millions of rows
+        part = table.iloc[:20000]
+        peaks = []
+        for copies in (1, 4):
+            frame = pd.concat([part] * copies, ignore_index=True)
+            tracemalloc.start()
+            written = write_workbook(path, {"Forecast": frame}, max_rows=len(part) + 1)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert len(written) == 4 and peaks[1] < peaks[0] * 1.2, (written, peaks)
+        print(f"excel export {len(frame)} rows on {len(written)} sheets  peak {peaks[1] / 1e6:.1f} MB"
+              f" (vs {peaks[0] / 1e6:.1f} MB for {len(part)} rows)")
+
+
+if __name__ == "__main__":
+    main()
+    bench_horizon()
+    bench_scenarios()
+    bench_sweep()
+    bench_slot_edits()
+    bench_disk_cache()
+    bench_montecarlo()
+    bench_schema()
+    bench_rollup()
+    bench_charts()
+    bench_export()
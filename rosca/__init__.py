@@ -0,0 +1,54 @@
+# ROSCA forecast engine – headless, NumPy-backed core shared by the Streamlit apps
+
+from .cache import ResultCache, SharedResultCache
+from .cohorts import CohortLedger
+from .config import ForecastConfig, canonical_digest, load_config
+from .engine import (
+    COMMITTEE,
+    LIFECYCLE,
+    MODEL_VERSION,
+    ForecastGrid,
+    UserFlows,
+    compute_grid,
+    compute_user_flows,
+    run_forecast,
+)
+from .montecarlo import MonteCarloResult, simulate_defaults
+from .rejoin import RejoinSchedule, rejoin_kernel
+from .rollup import RollupCube, period_summaries
+from .scenarios import ScenarioCube, run_scenarios
+from .schema import compact_frame, footprint
+from .stats import PathStats, QuantileSketch, RunningMoments
+from .sweep import expand_grid, run_sweep
+
+__all__ = [
+    "CohortLedger",
+    "COMMITTEE",
+    "LIFECYCLE",
+    "MODEL_VERSION",
+    "MonteCarloResult",
+    "PathStats",
+    "QuantileSketch",
+    "ForecastConfig",
+    "ForecastGrid",
+    "RejoinSchedule",
+    "RollupCube",
+    "ResultCache",
+    "RunningMoments",
+    "ScenarioCube",
+    "SharedResultCache",
+    "UserFlows",
+    "canonical_digest",
+    "compact_frame",
+    "compute_grid",
+    "compute_user_flows",
+    "expand_grid",
+    "footprint",
+    "load_config",
+    "period_summaries",
+    "rejoin_kernel",
+    "run_forecast",
+    "run_scenarios",
+    "run_sweep",
+    "simulate_defaults",
+]
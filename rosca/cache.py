@@ -0,0 +1,312 @@
+# Forecast result caches
+#
+# ResultCache        – persistent, on disk, survives restarts
+# SharedResultCache  – in memory, one per process, shared by every session
+#
+# Persistent cache:
+# Forecasts are stored as uncompressed NPZ files named
+# ``<config digest>-<MODEL_VERSION>.npz`` under a configurable directory
+# (``ROSCA_CACHE_DIR``, default ~/.cache/rosca).  Only the user flows and the
+# slot matrices are stored; summaries and the slot-level table are cheap
+# reductions of them, so a stored forecast loads in milliseconds.
+#
+# Writes go to a temporary file in the same directory and are renamed into
+# place with os.replace, so concurrent sessions never see a partial file.
+# Reads touch the file's mtime, which makes mtime order an LRU order; the
+# directory is trimmed to ``max_bytes`` by deleting the oldest files.  A save
+# interrupted by a crash leaves its temporary file behind; eviction deletes
+# any older than ``STALE_TMP_SECONDS``, long after a live save has finished.
+#
+# Shared cache: identical forecasts requested by different sessions resolve
+# to the same objects instead of per-session copies.  Every entry is charged
+# its array / frame bytes; the cache stays under a byte ceiling by evicting
+# least recently used entries and drops entries older than a TTL.
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .engine import MODEL_VERSION, ForecastGrid, UserFlows
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rosca")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+STALE_TMP_SECONDS = 600
+
+_FLOW_ARRAYS = (
+    "months", "durations", "slabs", "new_users", "rejoining", "cohort_users", "active", "base", "rejoin_weight",
+)
+_GRID_ARRAYS = ("slot_fee", "slot_blocked", "slot_valid", "fee_schedule")
+_GRID_SCALARS = ("kibor", "spread", "default_rate", "fee_upfront", "default_fee_pct")
+
+
+def _encode_rest(rest_period):
+    if isinstance(rest_period, Mapping):
+        return json.dumps({str(k): float(v) for k, v in rest_period.items()})
+    return json.dumps(int(rest_period))
+
+
+def _decode_rest(text):
+    rest = json.loads(text)
+    return {int(k): v for k, v in rest.items()} if isinstance(rest, dict) else rest
+
+
+class ResultCache:
+    """Size-bounded LRU cache of forecasts on disk, keyed by config digest.
+
+    ``hits`` and ``misses`` count lookups made through this instance.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, version=MODEL_VERSION):
+        self.directory = directory or os.environ.get("ROSCA_CACHE_DIR", DEFAULT_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("ROSCA_CACHE_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.directory, f"{digest}-{self.version}.npz")
+
+    def load(self, config):
+        """Stored ForecastGrid for ``config``, or ``None``."""
+        path = self.path(config.digest)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                forecast = self._decode(data)
+            os.utime(path)
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            # Missing, evicted mid-read or written by an incompatible version
+            self.misses += 1
+            return None
+        self.hits += 1
+        return forecast
+
+    def save(self, config, forecast):
+        """Store ``forecast`` atomically, then evict down to ``max_bytes``."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **self._encode(forecast))
+            os.replace(tmp, self.path(config.digest))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def get_or_compute(self, config, compute):
+        """Stored forecast for ``config``, else ``compute()`` stored for next time."""
+        forecast = self.load(config)
+        if forecast is None:
+            forecast = compute()
+            self.save(config, forecast)
+        return forecast
+
+    def entries(self):
+        """``(mtime, size, path)`` of every cache file, oldest first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return sorted(entries)
+
+    def _remove_stale_tmp(self):
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for name in os.listdir(self.directory):
+            if not name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        self._remove_stale_tmp()
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "entries": len(entries), "bytes": sum(size for _, size, _ in entries),
+        }
+
+    @staticmethod
+    def _encode(forecast):
+        flows = forecast.flows
+        data = {name: getattr(flows, name) for name in _FLOW_ARRAYS}
+        data.update({name: getattr(forecast, name) for name in _GRID_ARRAYS})
+        data.update({name: np.asarray(getattr(forecast, name)) for name in _GRID_SCALARS})
+        data["model"] = np.asarray(flows.model)
+        data["rest_period"] = np.asarray(_encode_rest(flows.rest_period))
+        return data
+
+    @staticmethod
+    def _decode(data):
+        flows = UserFlows(
+            model=str(data["model"]), rest_period=_decode_rest(str(data["rest_period"])),
+            **{name: data[name] for name in _FLOW_ARRAYS},
+        )
+        return ForecastGrid(
+            flows=flows,
+            **{name: data[name] for name in _GRID_ARRAYS},
+            **{name: data[name].item() for name in _GRID_SCALARS},
+        )
+
+
+def nbytes(value, _seen=None):
+    """Approximate memory held by ``value``: arrays, frames, bytes and containers of them."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, Mapping):
+        return sum(nbytes(k, seen) + nbytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(nbytes(v, seen) for v in value)
+    if hasattr(value, "__dict__"):
+        return nbytes(vars(value), seen)
+    return 0
+
+
+class SharedResultCache:
+    """Thread-safe in-memory LRU cache with a byte ceiling and a TTL.
+
+    Values are shared, not copied: callers must treat them as read-only.
+    Concurrent requests for the same missing key compute it once.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()   # key -> (value, size, stored_at)
+        self._lock = threading.Lock()
+        self._pending = {}              # key -> lock held while computing it
+
+    def __contains__(self, key):
+        """Membership test that does not count as a lookup or refresh the entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (self.ttl is None or time.monotonic() - entry[2] <= self.ttl)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value``; values larger than the whole ceiling are not kept."""
+        size = nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size, time.monotonic())
+            self.bytes += size
+            self._expire()
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            pending = self._pending.setdefault(key, threading.Lock())
+        with pending:
+            # Another session may have finished computing it meanwhile
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            try:
+                return self.put(key, compute())
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        for key in [k for k, (_, _, stored) in self._entries.items() if now - stored > self.ttl]:
+            self._drop(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,80 @@
+# Chart rendering – PNGs drawn on the Agg backend without leaking figures
+#
+# pyplot keeps every figure it creates in a global registry until it is
+# closed, so an app calling plt.subplots() on each rerun grows for the life
+# of the server process.  Charts here are drawn on matplotlib's object API –
+# a Figure on an explicit Agg canvas, never registered with pyplot – rendered
+# to PNG bytes and cleared in a ``finally`` block, so nothing outlives the
+# call even when drawing fails.  Callers cache the bytes (rosca.ui.cached_chart
+# keeps a bounded LRU keyed on forecast digest and metric).
+#
+# A line has no use for more points than the figure has pixels across: long
+# series are first reduced with largest-triangle-three-buckets (LTTB), which
+# keeps the peaks and troughs a plain stride would skip.
+
+import io
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def lttb(x, y, n_out):
+    """Indices of ``n_out`` points of the line (x, y) chosen by largest-triangle-three-buckets.
+
+    The first and last points are always kept; the rest are split into
+    ``n_out - 2`` buckets, and each bucket keeps the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    mean.  Returns every index when the line is already short enough.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = y.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < edges.size:
+            cx, cy = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def _positions(x):
+    """``x`` as float64 for LTTB's areas; dates count in nanoseconds."""
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def line_chart_png(x, y, *, label=None, title=None, ylabel=None, size=(6.4, 4.8), dpi=100, max_points=None):
+    """PNG bytes of a line chart of ``y`` against ``x``.
+
+    Lines longer than ``max_points`` (default: the figure's width in
+    pixels) are reduced with ``lttb`` before drawing.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    keep = lttb(_positions(x), y, max_points or int(size[0] * dpi))
+    figure = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(figure)
+    try:
+        ax = figure.subplots()
+        ax.plot(x[keep], y[keep], label=label)
+        ax.tick_params(axis="x", labelrotation=45)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        if title:
+            ax.set_title(title)
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png", bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        figure.clear()
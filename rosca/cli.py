@@ -0,0 +1,177 @@
+# Command-line batch runner – forecasts without Streamlit
+#
+#   python -m rosca configs/ -o results -f parquet,xlsx
+#
+# Every config is a JSON or TOML file of run_forecast keywords (see
+# ``rosca.config.load_config``); directories are searched for them.  Each run
+# writes its files to ``<output>/<config name>/`` with a manifest of the config
+# digest.  Forecasts come from the on-disk ResultCache when their config is
+# unchanged, and a run whose manifest already matches its digest, model
+# version and formats is skipped without touching its files.  A run that
+# fails – a missing optional dependency, a full disk – is recorded as failed,
+# in the timing table and its manifest, and the batch carries on.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .cache import ResultCache
+from .config import load_config
+from .engine import MODEL_VERSION, run_forecast
+from .export import COLUMNAR_FORMATS, forecast_tables, write_live_workbook, write_tables, write_workbook
+
+FORMATS = ("parquet", "feather", "xlsx", "live")
+CONFIG_EXTENSIONS = (".json", ".toml")
+MANIFEST = "manifest.json"
+
+
+def find_configs(paths):
+    """Config files named on the command line or found (recursively, sorted) in directories."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                found.extend(os.path.join(root, name) for name in sorted(files)
+                             if name.lower().endswith(CONFIG_EXTENSIONS))
+        else:
+            found.append(path)
+    return found
+
+
+def _run_names(paths):
+    names, seen = [], {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(stem if seen[stem] == 1 else f"{stem}-{seen[stem]}")
+    return names
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(directory, entry):
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(entry, f, indent=2)
+
+
+def write_results(directory, forecast, config, formats):
+    """Write ``formats`` of one forecast into ``directory``; returns ``{file: rows}``."""
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    tables = None
+    for fmt in formats:
+        if fmt in COLUMNAR_FORMATS or fmt == "xlsx":
+            tables = tables or forecast_tables(forecast)
+        if fmt in COLUMNAR_FORMATS:
+            written.update({os.path.basename(path): rows for path, rows in write_tables(directory, tables, fmt).items()})
+        elif fmt == "xlsx":
+            written["forecast.xlsx"] = sum(write_workbook(os.path.join(directory, "forecast.xlsx"), tables).values())
+        elif fmt == "live":
+            rows = write_live_workbook(os.path.join(directory, "model.xlsx"), forecast, config)
+            written["model.xlsx"] = sum(rows.values())
+        else:
+            raise ValueError(f"Unknown output format {fmt!r}; expected one of {FORMATS}")
+    return written
+
+
+def run_config(path, directory, formats, cache=None, force=False):
+    """Run one config file; returns a result dict for the timing table."""
+    result = {"config": path, "status": "failed", "forecast_ms": 0.0, "export_ms": 0.0, "rows": 0, "digest": ""}
+    t0 = time.perf_counter()
+    try:
+        config = load_config(path)
+    except (OSError, ValueError) as exc:
+        result["error"] = str(exc)
+        return result
+    result["digest"] = config.digest
+
+    manifest = _read_manifest(directory)
+    if (not force and manifest is not None and "error" not in manifest and manifest.get("digest") == config.digest
+            and manifest.get("model_version") == MODEL_VERSION and manifest.get("formats") == list(formats)
+            and all(os.path.exists(os.path.join(directory, name)) for name in manifest.get("files", {}))):
+        result.update(status="unchanged", rows=sum(manifest["files"].values()))
+        return result
+
+    entry = {
+        "config": os.path.abspath(path), "digest": config.digest, "model_version": MODEL_VERSION,
+        "formats": list(formats),
+    }
+    try:
+        if cache is None:
+            forecast, status = run_forecast(**config), "computed"
+        else:
+            hits = cache.hits
+            forecast = cache.get_or_compute(config, lambda: run_forecast(**config))
+            status = "cached" if cache.hits > hits else "computed"
+        t1 = time.perf_counter()
+        files = write_results(directory, forecast, config, formats)
+        t2 = time.perf_counter()
+        _write_manifest(directory, {**entry, "files": files})
+    except Exception as exc:  # one bad run must not stop the batch
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _write_manifest(directory, {**entry, "status": "failed", "error": result["error"]})
+        except OSError:
+            pass  # the run's directory is not writable; the timing table still reports it
+        return result
+    result.update(
+        status=status, forecast_ms=(t1 - t0) * 1e3, export_ms=(t2 - t1) * 1e3, rows=sum(files.values()),
+    )
+    return result
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m rosca", description="Run ROSCA forecasts from JSON / TOML configs without Streamlit.",
+    )
+    parser.add_argument("configs", nargs="+", help="config files or directories of them")
+    parser.add_argument("-o", "--output", default="rosca-results", help="output directory (default: %(default)s)")
+    parser.add_argument(
+        "-f", "--formats", default="parquet",
+        help=f"comma-separated output formats from {', '.join(FORMATS)} (default: %(default)s)",
+    )
+    parser.add_argument("--cache-dir", help="forecast cache directory (default: $ROSCA_CACHE_DIR or ~/.cache/rosca)")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute and do not store forecasts")
+    parser.add_argument("--force", action="store_true", help="rewrite outputs even when their manifest matches")
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    formats = tuple(dict.fromkeys(f.strip() for f in args.formats.split(",") if f.strip()))
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown or not formats:
+        _parser().error(f"unknown formats {unknown}; expected some of {', '.join(FORMATS)}")
+
+    paths = find_configs(args.configs)
+    if not paths:
+        print("No .json or .toml configs found", file=sys.stderr)
+        return 1
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+
+    print(f"{'run':24s} {'status':9s} {'forecast':>11s} {'export':>11s} {'rows':>10s}  digest")
+    counts = {}
+    started = time.perf_counter()
+    for path, name in zip(paths, _run_names(paths)):
+        result = run_config(path, os.path.join(args.output, name), formats, cache, args.force)
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        print(
+            f"{name[:24]:24s} {result['status']:9s} {result['forecast_ms']:8.1f} ms {result['export_ms']:8.1f} ms"
+            f" {result['rows']:>10,}  {result['digest'][:12]}",
+            flush=True,
+        )
+        if "error" in result:
+            print(f"  {result['error']}", file=sys.stderr)
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"{len(paths)} runs in {time.perf_counter() - started:.2f} s: {summary} → {args.output}")
+    return 1 if counts.get("failed") else 0
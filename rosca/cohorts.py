@@ -0,0 +1,67 @@
+# Cohort ledger – difference-array bookkeeping for committee cohorts
+#
+# Each cohort is recorded once as +users at its start month and -users the month
+# after it ends, so active users for every month come from one cumulative sum
+# instead of rescanning every cohort ever created.  Resting and rejoining users
+# are point events scheduled when the cohort is added.
+
+from bisect import bisect_right
+
+import numpy as np
+
+
+class CohortLedger:
+    """Active / resting / rejoining users over a fixed horizon of ``months``.
+
+    Cohorts are kept as ``(start, end, users, kind, duration)`` tuples – the same
+    shape the v7 lifecycle model used for ``active_cohorts`` – for drill-down.
+    Events that fall after the horizon are dropped.
+    """
+
+    def __init__(self, months, dtype=np.float64):
+        self.months = months
+        self.cohorts = []
+        self._starts = []
+        self._active_diff = np.zeros(months + 2, dtype=dtype)
+        self._resting = np.zeros(months + 2, dtype=dtype)
+        self._rejoining = np.zeros(months + 2, dtype=dtype)
+
+    def _schedule(self, array, month, users):
+        if month <= self.months:
+            array[month] += users
+
+    def add(self, start, duration, users, kind, rest_period=0):
+        """Record a cohort running ``start .. start + duration - 1``.
+
+        Its members rest the month after it ends and rejoin ``rest_period``
+        months later.
+        """
+        end = start + duration - 1
+        self.cohorts.append((start, end, users, kind, duration))
+        self._starts.append(start)
+        self._schedule(self._active_diff, start, users)
+        self._schedule(self._active_diff, end + 1, -users)
+        self._schedule(self._resting, end + 1, users)
+        self._schedule(self._rejoining, end + 1 + rest_period, users)
+
+    def rejoining_at(self, month):
+        """Users scheduled to rejoin in ``month`` by cohorts added so far."""
+        return self._rejoining[month]
+
+    def active(self):
+        """(months,) users in a running cohort, months 1..N."""
+        return np.cumsum(self._active_diff)[1:self.months + 1]
+
+    def resting(self):
+        """(months,) users entering their rest period."""
+        return self._resting[1:self.months + 1].copy()
+
+    def rejoining(self):
+        """(months,) users returning from rest."""
+        return self._rejoining[1:self.months + 1].copy()
+
+    def cohorts_active_in(self, month):
+        """Cohort tuples running in ``month``."""
+        # Cohorts are added in start order, so candidates are a prefix
+        candidates = self.cohorts[:bisect_right(self._starts, month)]
+        return [c for c in candidates if c[1] >= month]
@@ -0,0 +1,251 @@
+# Canonical forecast configuration
+#
+# ForecastConfig holds every run_forecast input in one immutable object.  It is
+# validated once on construction and carries a sha256 digest of a canonical
+# encoding (mapping keys sorted, numbers as floats), so Streamlit caches, sweeps
+# and persisted results all key on the same short string instead of hashing
+# nested dicts on every call.  The config is also a read-only mapping of
+# run_forecast keywords: ``run_forecast(**config)`` and ``dict(config, kibor=12)``
+# both work.  ``load_config`` reads one from a JSON or TOML file.
+
+import hashlib
+import json
+import math
+import os
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .engine import COMMITTEE, MAX_DURATION, MODELS
+from .rejoin import rest_distribution
+
+FLOW_FIELDS = (
+    "tam", "start_users", "monthly_growth", "yearly_growth", "rest_period",
+    "durations", "slabs", "duration_alloc", "slab_alloc", "months", "model",
+)
+RATE_FIELDS = (
+    "slot_fees", "slot_blocked", "kibor", "spread", "default_rate", "fee_upfront", "default_fee_pct",
+)
+FIELDS = FLOW_FIELDS + RATE_FIELDS
+
+# Allocation totals may be off by float rounding of slider values
+_ALLOC_TOLERANCE = 1e-6
+
+
+def _canonical(value):
+    if isinstance(value, Mapping):
+        return [[_canonical(k), _canonical(v)] for k, v in sorted(value.items(), key=lambda kv: float(kv[0]))]
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool) or type(value).__name__ == "bool_":
+        return bool(value)
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"Non-finite value {value!r} in config")
+    return number
+
+
+def canonical_digest(value):
+    """sha256 hex digest of ``value`` in canonical form.
+
+    Mappings hash the same whatever their insertion order and ``2`` hashes
+    like ``2.0``; sequences keep their order.
+    """
+    encoded = json.dumps(_canonical(value), separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+class ForecastConfig:
+    """Frozen, validated inputs of one forecast.
+
+    ``digest`` covers every field; ``flows_digest`` only the inputs of the
+    user-flow stage, so a rate or fee change keeps it.  Invalid configs raise
+    ``ValueError`` listing every problem found.
+    """
+
+    __slots__ = FIELDS + ("digest", "flows_digest")
+
+    def __init__(
+        self,
+        *,
+        tam,
+        start_users,
+        monthly_growth,
+        yearly_growth,
+        rest_period,
+        durations,
+        slabs,
+        duration_alloc,
+        slab_alloc,
+        slot_fees,
+        slot_blocked,
+        kibor,
+        spread,
+        default_rate,
+        fee_upfront,
+        default_fee_pct=0.0,
+        months=60,
+        model=COMMITTEE,
+    ):
+        values = {
+            "tam": float(tam), "start_users": float(start_users),
+            "monthly_growth": float(monthly_growth), "yearly_growth": float(yearly_growth),
+            "rest_period": _freeze(rest_period) if isinstance(rest_period, Mapping) else int(rest_period),
+            "durations": tuple(int(d) for d in durations), "slabs": tuple(int(s) for s in slabs),
+            "duration_alloc": _freeze(duration_alloc), "slab_alloc": _freeze(slab_alloc),
+            "months": int(months), "model": model,
+            "slot_fees": _freeze(slot_fees), "slot_blocked": _freeze(slot_blocked),
+            "kibor": float(kibor), "spread": float(spread), "default_rate": float(default_rate),
+            "fee_upfront": bool(fee_upfront), "default_fee_pct": float(default_fee_pct),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+        self._validate()
+        object.__setattr__(self, "flows_digest", canonical_digest([values[k] for k in FLOW_FIELDS]))
+        object.__setattr__(self, "digest", canonical_digest([values[k] for k in FIELDS]))
+
+    def _validate(self):
+        problems = []
+        if self.model not in MODELS:
+            problems.append(f"unknown model {self.model!r}; expected one of {MODELS}")
+        if self.months < 1:
+            problems.append("the horizon must be at least one month")
+        if self.tam < 0 or not 0 <= self.start_users <= self.tam:
+            problems.append("start users must lie between 0 and the TAM")
+        if not self.durations or min(self.durations) < 1 or len(set(self.durations)) != len(self.durations):
+            problems.append("durations must be distinct positive month counts")
+        elif max(self.durations) > MAX_DURATION:
+            problems.append(f"durations must be at most {MAX_DURATION} months")
+        if not self.slabs or min(self.slabs) <= 0:
+            problems.append("slabs must be positive amounts")
+        if min(self.kibor, self.spread, self.default_rate, self.default_fee_pct) < 0:
+            problems.append("rates must be non-negative")
+        if self.default_rate > 100 or self.default_fee_pct > 100:
+            problems.append("default rate and default fee are percentages of at most 100")
+        try:
+            rest_distribution(self.rest_period)
+        except ValueError as exc:
+            problems.append(str(exc))
+
+        total = sum(self.duration_alloc.get(d, 0) for d in self.durations)
+        if abs(total - 100) > _ALLOC_TOLERANCE:
+            problems.append(f"duration allocation totals {total:g}%, not 100%")
+        for d in self.durations:
+            if self.duration_alloc.get(d, 0):
+                slab_total = sum(self.slab_alloc.get(d, {}).get(s, 0) for s in self.slabs)
+                if abs(slab_total - 100) > _ALLOC_TOLERANCE:
+                    problems.append(f"{d}-month slab allocation totals {slab_total:g}%, not 100%")
+            fees, blocked = self.slot_fees.get(d, {}), self.slot_blocked.get(d, {})
+            missing = [s for s in range(1, d + 1) if s not in fees or s not in blocked]
+            if missing:
+                problems.append(f"{d}-month committee has no fee / block setting for slots {missing}")
+            elif any(not 0 <= fees[s] <= 100 for s in range(1, d + 1)):
+                problems.append(f"{d}-month slot fees must lie between 0 and 100%")
+        if problems:
+            raise ValueError("Invalid forecast config: " + "; ".join(problems))
+
+    # --- immutability -------------------------------------------------------
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ForecastConfig is immutable; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("ForecastConfig is immutable")
+
+    def __reduce__(self):
+        return (_rebuild, (self.to_dict(),))
+
+    def replace(self, **changes):
+        """New config with some fields changed (validated again)."""
+        return ForecastConfig(**dict(self.to_dict(), **changes))
+
+    # --- mapping of run_forecast keywords --------------------------------------
+
+    def keys(self):
+        return FIELDS
+
+    def __getitem__(self, name):
+        if name not in FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        return self[name] if name in FIELDS else default
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def to_dict(self):
+        """Plain ``run_forecast`` keyword dict (nested mappings copied to dicts)."""
+        return {name: _thaw(getattr(self, name)) for name in FIELDS}
+
+    def flow_inputs(self):
+        return {name: getattr(self, name) for name in FLOW_FIELDS}
+
+    def rate_inputs(self):
+        return {name: getattr(self, name) for name in RATE_FIELDS}
+
+    # --- identity -------------------------------------------------------------
+
+    def __eq__(self, other):
+        return isinstance(other, ForecastConfig) and other.digest == self.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"ForecastConfig(model={self.model!r}, months={self.months}, digest={self.digest[:12]})"
+
+
+def _rebuild(values):
+    return ForecastConfig(**values)
+
+
+def _int_keys(value):
+    # JSON and TOML keys are strings; durations, slots, slabs and rest months are ints
+    if isinstance(value, Mapping):
+        return {int(k) if isinstance(k, str) and k.lstrip("-").isdigit() else k: _int_keys(v)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_int_keys(v) for v in value]
+    return value
+
+
+def load_config(path):
+    """ForecastConfig from a ``.json`` or ``.toml`` file of run_forecast keywords."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    elif extension == ".toml":
+        import tomllib
+
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        raise ValueError(f"{path}: expected a .json or .toml config")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: the config must be a table of run_forecast keywords")
+    unknown = sorted(set(data) - set(FIELDS))
+    if unknown:
+        raise ValueError(f"{path}: unknown config keys {unknown}")
+    try:
+        return ForecastConfig(**_int_keys(data))
+    except TypeError as exc:
+        raise ValueError(f"{path}: {exc}") from None
@@ -0,0 +1,683 @@
+# ROSCA forecast engine – vectorized month × duration × slab × slot kernel
+#
+# The Streamlit apps used to walk months, durations, slabs and slots in four
+# nested loops and append one dict per cell.  Here the only sequential part is
+# the month-level user flow (growth is capped by TAM and feeds on rejoiners);
+# everything below it is a broadcast over a (month, duration, slab, slot) grid.
+
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from .rejoin import combined_kernel
+
+# Model variants
+# COMMITTEE – rosco_forecast_app_v6_committee_system.py: growth compounds on the
+#             current user base, fee only when collected upfront.
+# LIFECYCLE – rosco_forecast_app_v7_complete.py: growth on the starting base,
+#             payout / refund / loss-on-payout columns.
+COMMITTEE = "committee"
+LIFECYCLE = "lifecycle"
+MODELS = (COMMITTEE, LIFECYCLE)
+MAX_DURATION = 120  # months; keeps Duration and Slot within int8 in the table
+
+# Bump whenever a change alters forecast numbers; persisted results are keyed on it
+MODEL_VERSION = "1"
+
+
+def anniversary_months(months):
+    """Boolean mask of months 13, 25, 37, ... – the start of every year after the first."""
+    months = np.asarray(months)
+    return (months > 1) & ((months - 1) % 12 == 0)
+
+
+@dataclass
+class UserFlows:
+    """Month-level user flows and the per-slot users of every cohort."""
+
+    model: str
+    months: np.ndarray        # (M,) 1-based month index
+    durations: np.ndarray     # (D,) committee durations, in selection order
+    slabs: np.ndarray         # (B,) contribution slabs
+    new_users: np.ndarray     # (M,) growth users joining each month
+    rejoining: np.ndarray     # (M,) users returning after their rest period
+    cohort_users: np.ndarray  # (M, D, B) users per slot of each cohort
+    active: np.ndarray        # (D, B) cohorts with a non-zero allocation
+    base: np.ndarray          # (M,) users split across cohorts each month
+    rejoin_weight: np.ndarray  # (D,) share of the base starting each duration
+    rest_period: object       # months, or {months: probability}
+
+
+def _allocation_shares(durations, slabs, duration_alloc, slab_alloc):
+    d_share = np.array([duration_alloc.get(d, 0) for d in durations], dtype=np.float64) / 100
+    b_share = np.array(
+        [[slab_alloc.get(d, {}).get(s, 0) for s in slabs] for d in durations], dtype=np.float64
+    ).reshape(len(durations), len(slabs)) / 100
+    active = (d_share != 0)[:, None] & (b_share != 0)
+    return d_share, np.where(active, b_share, 0.0), active
+
+
+# (minimum, maximum, where) for the recurrence on Python floats and on vectors
+_SCALAR_OPS = (min, max, lambda cond, a, b: a if cond else b)
+_VECTOR_OPS = (np.minimum, np.maximum, np.where)
+
+
+def _flow_months(model, tam, start_users, growth_rate, year_bump, months, rejoined, spread, ops):
+    """The TAM-capped user recurrence, one month at a time.
+
+    Written once for both paths of ``flow_recurrence``: ``growth_rate`` is a
+    float with ``_SCALAR_OPS`` or an (S,) vector with ``_VECTOR_OPS``.
+    ``rejoined(m)`` returns month m's rejoining users and ``spread(m, base)``
+    sends month m's base back through the rejoin kernel.  Yields
+    ``(base, new users, rejoining)`` for every month.
+    """
+    minimum, maximum, where = ops
+    anniversary = anniversary_months(np.arange(1, months + 1)).tolist()
+    current_users = float(start_users)
+    used_users = 0.0 if model == COMMITTEE else float(start_users)
+    for m in range(1, months + 1):
+        rejoin_m = rejoined(m)
+        bump = year_bump if anniversary[m - 1] else 0
+        growth_users = current_users * growth_rate
+        if model == COMMITTEE:
+            if bump:
+                growth_users += bump
+            # growth is never negative, so capping at the remaining TAM is a min()
+            growth_users = minimum(growth_users, maximum(tam - used_users, 0))
+            current_users = maximum(growth_users + rejoin_m, 0)
+            used_users += growth_users
+            base_m = current_users
+        else:
+            growth_users = where(used_users + growth_users + bump > tam, maximum(tam - used_users, 0), growth_users)
+            used_users += growth_users + bump
+            base_m = growth_users + rejoin_m
+
+        # Growth is capped by TAM and feeds on rejoiners, so the convolution is
+        # applied in scatter form: each month's base is spread over the kernel
+        spread(m, base_m)
+        yield base_m, growth_users, rejoin_m
+
+
+def flow_recurrence(model, tam, start_users, growth_rate, year_bump, kernel, months):
+    """Month-level user recurrence for a batch of scenarios.
+
+    ``growth_rate`` is (S,) monthly growth as a fraction and ``kernel`` the
+    (S, K) combined rejoin kernel of each scenario.  Returns (S, M) arrays of
+    the base split across cohorts, new (growth) users and rejoining users.
+    """
+    n = growth_rate.shape[0]
+    if n == 1:
+        return tuple(v[None, :] for v in _single_flow_recurrence(
+            model, tam, start_users, float(growth_rate[0]), year_bump, kernel[0], months,
+        ))
+    width = kernel.shape[1]
+    # Month-major buffers keep each month's scenario vector contiguous
+    rejoin = np.zeros((months + 1 + width, n))
+    kernel_t = np.ascontiguousarray(kernel.T)
+    flows = np.empty((3, months, n))
+
+    def spread(m, base_m):
+        rejoin[m:m + width] += kernel_t * base_m
+
+    steps = _flow_months(
+        model, tam, start_users, growth_rate, year_bump, months, lambda m: rejoin[m].copy(), spread, _VECTOR_OPS,
+    )
+    for m, step in enumerate(steps):
+        flows[:, m] = step
+    base, new_users, rejoining = flows
+    return base.T, new_users.T, rejoining.T
+
+
+def _single_flow_recurrence(model, tam, start_users, growth_rate, year_bump, kernel, months):
+    """``flow_recurrence`` for one scenario, on Python floats.
+
+    A single run is the common case, and per-month NumPy calls on length-1
+    vectors cost more than the arithmetic; the rejoin scatter only visits the
+    kernel's non-zero lags.  The recurrence itself is the shared
+    ``_flow_months``, so the results match the batched path exactly.
+    """
+    lags = np.flatnonzero(kernel)
+    scatter = list(zip(lags.tolist(), kernel[lags].tolist()))
+    rejoin = [0.0] * (months + 1 + kernel.size)
+
+    def spread(m, base_m):
+        for lag, weight in scatter:
+            rejoin[m + lag] += weight * base_m
+
+    steps = _flow_months(model, tam, start_users, growth_rate, year_bump, months, rejoin.__getitem__, spread, _SCALAR_OPS)
+    base, new_users, rejoining = np.ascontiguousarray(np.array(list(steps), dtype=np.float64).reshape(months, 3).T)
+    return base, new_users, rejoining
+
+
+def compute_user_flows(
+    *,
+    tam,
+    start_users,
+    monthly_growth,
+    yearly_growth,
+    rest_period,
+    durations,
+    slabs,
+    duration_alloc,
+    slab_alloc,
+    months=60,
+    model=COMMITTEE,
+):
+    """Run the month-level user recurrence and split each month across cohorts.
+
+    Percentages are given in the same units as the sidebar (e.g. ``2.0`` for 2%).
+    ``months`` is the horizon; the yearly TAM bump lands on every anniversary
+    month, and runtime and memory grow linearly with it.  ``rest_period`` is a
+    number of months or a ``{months: probability}`` distribution (see
+    ``rosca.rejoin``).
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}; expected one of {MODELS}")
+
+    dur = np.asarray(durations, dtype=np.int64).reshape(-1)
+    if dur.size and dur.max() > MAX_DURATION:
+        raise ValueError(f"Durations must be at most {MAX_DURATION} months")
+    slab_arr = np.asarray(slabs, dtype=np.int64).reshape(-1)
+    d_share, b_share, active = _allocation_shares(dur.tolist(), slab_arr.tolist(), duration_alloc, slab_alloc)
+
+    # Share of a month's base starting each duration, and the combined lag
+    # kernel through which those starters come back
+    rejoin_weight = (d_share[:, None] * b_share).sum(axis=1)
+    kernel = combined_kernel(dur, rejoin_weight, rest_period)
+
+    base, new_users, rejoining = flow_recurrence(
+        model, tam, start_users, np.array([monthly_growth / 100]),
+        tam * (yearly_growth / 100), kernel[None, :], months,
+    )
+    base, new_users, rejoining = base[0], new_users[0], rejoining[0]
+
+    cohort_users = (base[:, None] * d_share)[:, :, None] * b_share
+    return UserFlows(
+        model=model,
+        months=np.arange(1, months + 1, dtype=np.int64),
+        durations=dur,
+        slabs=slab_arr,
+        new_users=new_users,
+        rejoining=rejoining,
+        cohort_users=cohort_users,
+        active=active,
+        base=base,
+        rejoin_weight=rejoin_weight,
+        rest_period=rest_period,
+    )
+
+
+@dataclass
+class ForecastGrid:
+    """Forecast on the (month, duration, slab, slot) grid.
+
+    Monthly and yearly summaries are reductions over the slab and slot axes
+    and never touch slot-level rows.  Slot-level columns are broadcast by
+    ``broadcast_columns`` / ``to_frame`` on each call and never kept on the
+    grid: grids are shared through the result caches, which charge an entry
+    its size once, when it is stored.
+    """
+
+    flows: UserFlows
+    slot_fee: np.ndarray      # (D, S) fee % per slot, 0 where blocked
+    slot_blocked: np.ndarray  # (D, S)
+    slot_valid: np.ndarray    # (D, S) slot <= duration
+    kibor: float
+    spread: float
+    default_rate: float
+    fee_upfront: bool
+    default_fee_pct: float = 0.0
+    fee_schedule: np.ndarray = None  # (D, S) fee % as entered, kept for blocked slots
+
+    def __post_init__(self):
+        if self.fee_schedule is None:
+            self.fee_schedule = self.slot_fee
+
+    @property
+    def slot_open(self):
+        return self.slot_valid & ~self.slot_blocked
+
+    @property
+    def nii_rate(self):
+        return (self.kibor + self.spread) / 100 / 12
+
+    def broadcast_columns(self):
+        """name -> array broadcastable to (M, D, B, S), built afresh on every call."""
+        flows = self.flows
+        first = np.zeros((1, 1, flows.slabs.size, self.n_slots), dtype=bool)
+        first[0, 0, :1, :1] = True
+        return self._column_values(
+            cohort=flows.cohort_users[..., None], month=flows.months[:, None, None, None],
+            new_users=flows.new_users[:, None, None, None], rejoining=flows.rejoining[:, None, None, None],
+            dur=flows.durations[None, :, None, None], slab=flows.slabs[None, None, :, None],
+            fee=self.slot_fee[None, :, None, :], open_slot=self.slot_open[None, :, None, :],
+            blocked=self.slot_blocked[None, :, None, :], first=first,
+        )
+
+    def _row_columns(self, template):
+        """name -> array broadcastable to (M, T) for the ``row_template`` offsets ``template``.
+
+        The same formulas as ``broadcast_columns``, evaluated on the emitted
+        rows only instead of on the whole grid and then gathered.
+        """
+        flows = self.flows
+        d_idx, b_idx, s_idx = np.unravel_index(template, self.shape[1:])
+        cohort = np.take(flows.cohort_users.reshape(flows.months.size, -1), d_idx * flows.slabs.size + b_idx, axis=1)
+        return self._column_values(
+            cohort=cohort, month=flows.months[:, None],
+            new_users=flows.new_users[:, None], rejoining=flows.rejoining[:, None],
+            dur=flows.durations[d_idx][None], slab=flows.slabs[b_idx][None],
+            fee=self.slot_fee[d_idx, s_idx][None], open_slot=self.slot_open[d_idx, s_idx][None],
+            blocked=self.slot_blocked[d_idx, s_idx][None], first=((b_idx == 0) & (s_idx == 0))[None],
+        )
+
+    def _column_values(self, *, cohort, month, new_users, rejoining, dur, slab, fee, open_slot, blocked, first):
+        # Cohort / month terms and per-cell terms arrive shaped to broadcast together
+        users = cohort * open_slot
+        deposit = users * slab * dur
+        nii = deposit * ((self.kibor + self.spread) / 100 / 12)
+
+        # New / rejoining users are reported on every duration's first slab and first slot
+        columns = {"New Users": np.where(first, new_users, 0.0), "Rejoining Users": np.where(first, rejoining, 0.0)}
+        if self.flows.model == COMMITTEE:
+            fee_col = deposit * (fee / 100) if self.fee_upfront else np.zeros_like(deposit)
+            profit = fee_col + nii - (deposit * self.default_rate / 100)
+            columns.update({
+                "Active Users": users, "Deposit": deposit, "Fee %": fee,
+                "Fee Collected": fee_col, "NII": nii, "Profit": profit,
+                "Blocked": blocked,
+            })
+        else:
+            payout = users * slab
+            fee_col = deposit * (fee / 100) if self.fee_upfront else payout * (fee / 100)
+            loss = payout * self.default_rate / 100
+            refund = np.where(month % dur < 2, deposit * (1 - self.default_fee_pct / 100), 0.0)
+            profit = fee_col + nii - loss
+            columns.update({
+                "State": np.where(open_slot, "Active", "Blocked"),
+                "Users": users, "Deposit": deposit, "Payout": payout, "Fee %": fee,
+                "Fee Collected": fee_col, "NII": nii, "Loss from Default": loss,
+                "Refund": refund, "Profit": profit,
+            })
+        return columns
+
+    def monthly_totals(self):
+        """name -> (M,) totals, reduced over slabs and slots without expanding them.
+
+        Users in a cohort are identical across its open slots, so every slot sum
+        collapses to a per-duration count of open slots or sum of their fees.
+        """
+        return dict(self._totals)
+
+    @cached_property
+    def _totals(self):
+        flows = self.flows
+        return monthly_totals(
+            flows.model, flows.months, flows.durations,
+            users_md=flows.cohort_users.sum(axis=2),
+            payout_md=flows.cohort_users @ flows.slabs.astype(np.float64),
+            n_open=self.slot_open.sum(axis=1).astype(np.float64),
+            fee_factor=(self.slot_fee / 100).sum(axis=1),
+            nii_rate=self.nii_rate, default_rate=self.default_rate,
+            fee_upfront=self.fee_upfront, default_fee_pct=self.default_fee_pct,
+        )
+
+    def update_slots(self, slot_fees=None, slot_blocked=None):
+        """Forecast with some slot fees or blocks changed, totals updated in place of a rerun.
+
+        ``slot_fees`` and ``slot_blocked`` are partial ``{duration: {slot: value}}``
+        diffs.  User flows do not depend on fees, and every monthly total is
+        linear in each duration's open-slot count and fee sum, so the change is
+        the totals of the edited durations evaluated on those differences –
+        O(months × slabs) per edited duration instead of a full recompute.
+        """
+        flows = self.flows
+        index = {int(d): i for i, d in enumerate(flows.durations.tolist())}
+        fees = self.fee_schedule.astype(np.float64)
+        blocked = self.slot_blocked.copy()
+        for target, edits, cast in ((fees, slot_fees, float), (blocked, slot_blocked, bool)):
+            for d, slots in (edits or {}).items():
+                if d not in index:
+                    raise ValueError(f"Duration {d} is not part of this forecast")
+                for s, value in slots.items():
+                    if not 1 <= s <= d:
+                        raise ValueError(f"A {d}-month committee has no slot {s}")
+                    target[index[d], s - 1] = cast(value)
+
+        open_slot = self.slot_valid & ~blocked
+        slot_fee = np.where(open_slot, fees, 0.0)
+        updated = replace(self, slot_fee=slot_fee, slot_blocked=blocked, fee_schedule=fees)
+
+        changed = np.flatnonzero(((slot_fee != self.slot_fee) | (blocked != self.slot_blocked)).any(axis=1))
+        if changed.size:
+            cohort = flows.cohort_users[:, changed]
+            delta = monthly_totals(
+                flows.model, flows.months, flows.durations[changed],
+                users_md=cohort.sum(axis=2),
+                payout_md=cohort @ flows.slabs.astype(np.float64),
+                n_open=(open_slot.sum(axis=1) - self.slot_open.sum(axis=1))[changed].astype(np.float64),
+                fee_factor=((slot_fee - self.slot_fee) / 100).sum(axis=1)[changed],
+                nii_rate=self.nii_rate, default_rate=self.default_rate,
+                fee_upfront=self.fee_upfront, default_fee_pct=self.default_fee_pct,
+            )
+            updated._totals = {name: total + delta[name] for name, total in self._totals.items()}
+        else:
+            updated._totals = self._totals
+        return updated
+
+    def duration_volumes(self):
+        """Per-slot users, payout and deposit of every (month, duration), before fees and blocking.
+
+        Rows are month-major with durations in forecast order.  Every monthly
+        total is these volumes weighted by the duration's open-slot count or
+        fee sum, which is what the live-model workbook's formulas do.
+        """
+        flows = self.flows
+        n_months, n_durations = flows.months.size, flows.durations.size
+        payout = flows.cohort_users @ flows.slabs.astype(np.float64)
+        return pd.DataFrame({
+            "Month": np.repeat(flows.months, n_durations),
+            "Year": np.repeat((flows.months - 1) // 12 + 1, n_durations),
+            "Duration": np.tile(flows.durations, n_months),
+            "Users / Slot": flows.cohort_users.sum(axis=2).reshape(-1),
+            "Payout / Slot": payout.reshape(-1),
+            "Deposit / Slot": (payout * flows.durations).reshape(-1),
+        })
+
+    def monthly(self):
+        """Monthly summary – same columns as ``df.groupby("Month")`` in the apps."""
+        totals = self.monthly_totals()
+        data = {"Month": self.flows.months}
+        data.update({name: totals[name] for name in SUMMARY_COLUMNS[self.flows.model]})
+        return pd.DataFrame(data)
+
+    def yearly(self):
+        """Yearly summary – same columns as ``df.groupby("Year")`` in the apps."""
+        totals = self.monthly_totals()
+        year_idx = (self.flows.months - 1) // 12
+        n_years = int(year_idx[-1]) + 1 if year_idx.size else 0
+        data = {"Year": np.arange(1, n_years + 1)}
+        data.update({
+            name: np.bincount(year_idx, weights=totals[name], minlength=n_years)
+            for name in SUMMARY_COLUMNS[self.flows.model]
+        })
+        return pd.DataFrame(data)
+
+    @property
+    def n_slots(self):
+        return self.slot_valid.shape[1]
+
+    @property
+    def shape(self):
+        return self.flows.cohort_users.shape + (self.n_slots,)
+
+    def row_template(self):
+        """Flat (duration, slab, slot) offsets of the rows emitted for every month.
+
+        Rows exist for cohorts with a non-zero allocation and slots within the
+        committee duration, in the legacy loop order.
+        """
+        mask = self.flows.active[:, :, None] & self.slot_valid[:, None, :]
+        return np.flatnonzero(mask)
+
+    @property
+    def table_columns(self):
+        """Columns of the slot-level table, in order."""
+        return _FRAME_COLUMNS[self.flows.model]
+
+    @property
+    def n_rows(self):
+        return self.flows.months.size * self.row_template().size
+
+    @property
+    def table_nbytes(self):
+        """Bytes of the ``to_frame`` table, from its dtypes without building it.
+
+        Categorical columns count their int8 codes; their categories are a
+        few labels and left out.
+        """
+        row = sum(
+            1 if FRAME_DTYPES.get(name) == "category" else np.dtype(FRAME_DTYPES.get(name, np.float64)).itemsize
+            for name in self.table_columns
+        )
+        return self.n_rows * row
+
+    def to_frame(self):
+        """Slot-level table with the same rows and columns as the legacy loop.
+
+        Columns are written into preallocated, compactly typed arrays (see
+        ``FRAME_DTYPES``) and wrapped without copying.
+        """
+        flows = self.flows
+        n_months = flows.months.size
+        template = self.row_template()
+        d_idx, b_idx, s_idx = np.unravel_index(template, self.shape[1:])
+
+        columns = self._row_columns(template)
+        data = {}
+        for name in _FRAME_COLUMNS[flows.model]:
+            dtype = FRAME_DTYPES.get(name, np.float64)
+            if name == "Month":
+                data[name] = np.repeat(flows.months.astype(dtype), template.size)
+            elif name == "Year":
+                data[name] = np.repeat(((flows.months - 1) // 12 + 1).astype(dtype), template.size)
+            elif name == "Duration":
+                data[name] = _tile(flows.durations[d_idx], n_months, dtype)
+            elif name == "Slot":
+                data[name] = _tile(s_idx + 1, n_months, dtype)
+            elif name == "Slab":
+                data[name] = pd.Categorical.from_codes(
+                    _tile(b_idx, n_months, np.int8), categories=pd.Index(flows.slabs)
+                )
+            else:
+                data[name] = self._column(columns[name], n_months, dtype)
+        return pd.DataFrame(data, copy=False)
+
+    def take(self, rows, columns=None, month_chunk=24):
+        """Rows at positions ``rows`` of the ``to_frame`` table, without building the table.
+
+        Row ``i`` is month ``i // len(row_template())`` at template offset
+        ``i % len(row_template())``.  Only the months the rows fall in are
+        broadcast, ``month_chunk`` months at a time, so a page of rows costs a
+        few months of grid whatever the horizon.
+        """
+        flows = self.flows
+        template = self.row_template()
+        names = self.table_columns if columns is None else tuple(columns)
+        rows = np.asarray(rows, dtype=np.int64)
+        m_idx, t_idx = np.divmod(rows, max(template.size, 1))
+        d_idx, b_idx, s_idx = np.unravel_index(template[t_idx], self.shape[1:])
+
+        data = {}
+        for name in names:
+            dtype = FRAME_DTYPES.get(name, np.float64)
+            if name == "Month":
+                data[name] = flows.months[m_idx].astype(dtype)
+            elif name == "Year":
+                data[name] = ((flows.months[m_idx] - 1) // 12 + 1).astype(dtype)
+            elif name == "Duration":
+                data[name] = flows.durations[d_idx].astype(dtype)
+            elif name == "Slot":
+                data[name] = (s_idx + 1).astype(dtype)
+            elif name == "Slab":
+                data[name] = pd.Categorical.from_codes(b_idx.astype(np.int8), categories=pd.Index(flows.slabs))
+            else:
+                data[name] = np.empty(rows.size, dtype=object if dtype == "category" else dtype)
+
+        computed = [name for name in names if name not in ("Month", "Year", "Duration", "Slot", "Slab")]
+        months = np.unique(m_idx)
+        for start in range(0, months.size if computed else 0, month_chunk):
+            chunk = months[start:start + month_chunk]
+            sub = self._month_subset(chunk)
+            hit = np.flatnonzero((m_idx >= chunk[0]) & (m_idx <= chunk[-1]))
+            local = np.searchsorted(chunk, m_idx[hit])
+            columns = sub.broadcast_columns()
+            for name in computed:
+                values = np.broadcast_to(np.asarray(columns[name]), sub.shape)
+                data[name][hit] = values[local, d_idx[hit], b_idx[hit], s_idx[hit]]
+        for name in computed:
+            if FRAME_DTYPES.get(name) == "category":
+                data[name] = pd.Categorical(data[name])
+        return pd.DataFrame(data, copy=False)
+
+    def _month_subset(self, month_idx):
+        """The same forecast restricted to the months at ``month_idx`` (sorted positions)."""
+        flows = self.flows
+        return replace(self, flows=replace(
+            flows, months=flows.months[month_idx], new_users=flows.new_users[month_idx],
+            rejoining=flows.rejoining[month_idx], cohort_users=flows.cohort_users[month_idx],
+            base=flows.base[month_idx],
+        ))
+
+    def _column(self, values, n_months, dtype):
+        """(M, T)-broadcastable ``values`` as one flat table column of ``dtype``."""
+        values = np.asarray(values)
+        if dtype == "category":
+            categories, codes = np.unique(values[0], return_inverse=True)
+            return pd.Categorical.from_codes(np.tile(codes.astype(np.int8), n_months), categories=categories)
+        if values.shape == (n_months, values.shape[-1]) and values.dtype == dtype and values.flags.c_contiguous:
+            return values.reshape(-1)  # a fresh full-size result: wrapped, not copied
+        out = np.empty((n_months, values.shape[-1]), dtype=dtype)
+        out[:] = values
+        return out.reshape(-1)
+
+
+def _tile(row, reps, dtype):
+    out = np.empty((reps, row.size), dtype=dtype)
+    out[:] = row
+    return out.reshape(-1)
+
+
+# Compact storage for the slot-level table; money and user counts stay float64.
+# Durations (and so slots) are capped at MAX_DURATION months, which fits int8.
+FRAME_DTYPES = {
+    "Month": np.int16,
+    "Year": np.int16,
+    "Duration": np.int8,
+    "Slot": np.int8,
+    "Slab": "category",
+    "State": "category",
+    "Blocked": np.bool_,
+}
+
+
+def monthly_totals(model, months, durations, *, users_md, payout_md, n_open, fee_factor,
+                   nii_rate, default_rate, fee_upfront, default_fee_pct=0.0):
+    """name -> (..., M) monthly totals from per-duration volumes.
+
+    ``users_md`` / ``payout_md`` are (..., M, D) users and payout per slot of
+    each duration; ``n_open`` and ``fee_factor`` are (D,) open-slot counts and
+    summed fee fractions.  Rates may be scalars or arrays broadcasting against
+    (..., M), which is how the scenario batch reuses this.
+    """
+    deposit_md = payout_md * durations
+    users = users_md @ n_open
+    deposit = deposit_md @ n_open
+    payout = payout_md @ n_open
+    if model == COMMITTEE:
+        fee = deposit_md @ fee_factor if fee_upfront else np.zeros_like(deposit)
+        loss = deposit * default_rate / 100
+    else:
+        fee = (deposit_md if fee_upfront else payout_md) @ fee_factor
+        loss = payout * default_rate / 100
+    nii = deposit * nii_rate
+    refund_month = (months[:, None] % durations) < 2
+    refund = (deposit_md * refund_month) @ n_open * (1 - default_fee_pct / 100)
+    return {
+        _USERS_COLUMN[model]: users, "Deposit": deposit, "Payout": payout,
+        "Fee Collected": fee, "NII": nii, "Loss from Default": loss,
+        "Refund": refund, "Profit": fee + nii - loss,
+    }
+
+
+_FRAME_COLUMNS = {
+    COMMITTEE: (
+        "Month", "Year", "Duration", "Slab", "Slot", "New Users", "Rejoining Users",
+        "Active Users", "Deposit", "Fee %", "Fee Collected", "NII", "Profit", "Blocked",
+    ),
+    LIFECYCLE: (
+        "Month", "Year", "Duration", "Slab", "Slot", "New Users", "Rejoining Users",
+        "State", "Users", "Deposit", "Payout", "Fee %", "Fee Collected", "NII",
+        "Loss from Default", "Refund", "Profit",
+    ),
+}
+
+_USERS_COLUMN = {COMMITTEE: "Active Users", LIFECYCLE: "Users"}
+
+SUMMARY_COLUMNS = {
+    COMMITTEE: ("Active Users", "Deposit", "Fee Collected", "NII", "Profit"),
+    LIFECYCLE: ("Users", "Deposit", "Payout", "Fee Collected", "NII", "Profit"),
+}
+
+
+def _slot_matrix(durations, slot_fees, slot_blocked):
+    n_slots = int(durations.max()) if durations.size else 0
+    slot_no = np.arange(1, n_slots + 1)
+    valid = slot_no[None, :] <= durations[:, None]
+    fee = np.zeros(valid.shape)
+    blocked = np.zeros(valid.shape, dtype=bool)
+    for i, d in enumerate(durations.tolist()):
+        for s in range(1, d + 1):
+            fee[i, s - 1] = slot_fees[d][s]
+            blocked[i, s - 1] = bool(slot_blocked[d][s])
+    return fee, blocked, valid
+
+
+def compute_grid(
+    flows,
+    *,
+    slot_fees,
+    slot_blocked,
+    kibor,
+    spread,
+    default_rate,
+    fee_upfront,
+    default_fee_pct=0.0,
+):
+    """Slot fee / blocking matrices and rates for a set of user flows.
+
+    Cheap: nothing is broadcast over the grid until a slot-level column is used.
+    """
+    fee_pct, blocked, valid = _slot_matrix(flows.durations, slot_fees, slot_blocked)
+    return ForecastGrid(
+        flows=flows, slot_fee=np.where(valid & ~blocked, fee_pct, 0.0), slot_blocked=blocked,
+        slot_valid=valid, kibor=kibor, spread=spread, default_rate=default_rate,
+        fee_upfront=fee_upfront, default_fee_pct=default_fee_pct, fee_schedule=fee_pct,
+    )
+
+
+def run_forecast(
+    *,
+    tam,
+    start_users,
+    monthly_growth,
+    yearly_growth,
+    rest_period,
+    durations,
+    slabs,
+    duration_alloc,
+    slab_alloc,
+    slot_fees,
+    slot_blocked,
+    kibor,
+    spread,
+    default_rate,
+    fee_upfront,
+    default_fee_pct=0.0,
+    months=60,
+    model=COMMITTEE,
+):
+    """Full forecast: user flows followed by the financial grid (summaries on demand)."""
+    flows = compute_user_flows(
+        tam=tam, start_users=start_users, monthly_growth=monthly_growth,
+        yearly_growth=yearly_growth, rest_period=rest_period, durations=durations,
+        slabs=slabs, duration_alloc=duration_alloc, slab_alloc=slab_alloc,
+        months=months, model=model,
+    )
+    return compute_grid(
+        flows, slot_fees=slot_fees, slot_blocked=slot_blocked, kibor=kibor,
+        spread=spread, default_rate=default_rate, fee_upfront=fee_upfront,
+        default_fee_pct=default_fee_pct,
+    )
@@ -0,0 +1,399 @@
+# Workbook export
+#
+# Builds the apps' Excel downloads outside the Streamlit rerun.  Sheets are
+# streamed through xlsxwriter's constant_memory mode: rows go out in order,
+# chunk by chunk, straight from the table's column arrays, so memory does not
+# grow with the row count.  Tables longer than Excel's row limit continue on
+# "Name (2)", "Name (3)", ... sheets.  ``frame_digest`` gives apps without a
+# ForecastConfig a content key to cache the resulting bytes under.
+#
+# The live-model workbook is the compact alternative for what-if work in
+# Excel: the rates and the slot fee / blocking matrix go on an Inputs sheet,
+# the fee-independent volumes of every (month, duration) on a Volumes sheet,
+# and the monthly / yearly summaries are formulas over the two.  It holds
+# months × durations rows instead of one row per slot, and editing an input
+# recalculates the summaries.
+#
+# For BI pipelines the same tables are also written as Parquet or Arrow IPC
+# (Feather) files.  Numeric columns are handed to Arrow without copying, and
+# the Month / Year / Duration / Slab / Slot / State key columns are
+# dictionary-encoded.  pyarrow is only imported when a columnar file is
+# written.
+
+import hashlib
+import io
+import os
+import zipfile
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .config import FLOW_FIELDS
+from .engine import COMMITTEE
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+ZIP_MIME = "application/zip"
+
+# Excel's hard limit, header row included
+EXCEL_MAX_ROWS = 1_048_576
+
+# Rows converted per chunk; progress is reported after each chunk
+CHUNK_ROWS = 50_000
+
+
+def frame_digest(*frames):
+    """sha256 of the column names and row hashes of ``frames``."""
+    h = hashlib.sha256()
+    for frame in frames:
+        h.update(repr(list(frame.columns)).encode())
+        h.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _columns(table):
+    """``(names, arrays)`` of a DataFrame or a ``{name: array}`` mapping."""
+    if isinstance(table, pd.DataFrame):
+        # NumPy-backed columns are viewed in place; extension columns (Arrow
+        # strings, categoricals) are sliced as they are rather than converted whole
+        columns = [table[name] for name in table.columns]
+        return list(table.columns), [
+            np.asarray(col) if isinstance(col.dtype, np.dtype) else col.array for col in columns
+        ]
+    if isinstance(table, Mapping):
+        return list(table), [np.asarray(values) for values in table.values()]
+    raise TypeError(f"Cannot export {type(table).__name__}; expected a DataFrame or a mapping of columns")
+
+
+def _sheet_names(name, rows, per_sheet):
+    parts = max(-(-rows // per_sheet), 1)
+    names = [name[:31]]
+    for part in range(2, parts + 1):
+        suffix = f" ({part})"
+        names.append(name[:31 - len(suffix)] + suffix)
+    return names
+
+
+def write_workbook(target, sheets, progress=None, chunk_rows=CHUNK_ROWS, max_rows=EXCEL_MAX_ROWS):
+    """Stream ``{name: table}`` into an xlsx file or binary file object.
+
+    Tables are DataFrames or ``{column: array}`` mappings.  Each table gets a
+    bold header row and is split across sheets every ``max_rows - 1`` data
+    rows.  ``progress(fraction, message)`` is called after every chunk.
+    Returns ``{sheet name: data rows written}``.
+    """
+    import xlsxwriter
+
+    tables = {name: _columns(table) for name, table in sheets.items()}
+    lengths = {name: len(arrays[0]) if arrays else 0 for name, (_, arrays) in tables.items()}
+    total = max(sum(lengths.values()), 1)
+    per_sheet = max_rows - 1
+    written = {}
+    done = 0
+
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "nan_inf_to_errors": True})
+    header = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+    try:
+        for name, (columns, arrays) in tables.items():
+            n = lengths[name]
+            for part, sheet_name in enumerate(_sheet_names(name, n, per_sheet)):
+                sheet = workbook.add_worksheet(sheet_name)
+                sheet.write_row(0, 0, columns, header)
+                first, last = part * per_sheet, min((part + 1) * per_sheet, n)
+                for start in range(first, last, chunk_rows):
+                    stop = min(start + chunk_rows, last)
+                    chunk = [values[start:stop].tolist() for values in arrays]
+                    for row, values in enumerate(zip(*chunk), start - first + 1):
+                        sheet.write_row(row, 0, values)
+                    del chunk  # free this chunk before the next one is built
+                    done += stop - start
+                    if progress:
+                        progress(done / total, f"Writing {sheet_name}: {stop - first:,} / {last - first:,} rows")
+                written[sheet_name] = last - first
+    finally:
+        workbook.close()
+    if progress:
+        progress(1.0, f"Workbook ready – {sum(written.values()):,} rows on {len(written)} sheets")
+    return written
+
+
+def workbook_bytes(sheets, progress=None):
+    """``(xlsx bytes, {sheet: rows})`` for ``{name: table}``; see ``write_workbook``."""
+    out = io.BytesIO()
+    written = write_workbook(out, sheets, progress)
+    return out.getvalue(), written
+
+
+# Input cells, named so the summary formulas read like the engine
+_RATE_NAMES = (
+    ("KIBOR", "KIBOR (%)", "kibor"),
+    ("Spread", "Spread (%)", "spread"),
+    ("DefaultRate", "Default Rate (%)", "default_rate"),
+    ("FeeUpfront", "Fee Upfront", "fee_upfront"),
+)
+
+_FLOW_LABELS = {
+    "tam": "TAM", "start_users": "Start Users", "monthly_growth": "Monthly Growth (%)",
+    "yearly_growth": "Yearly Growth (%)", "rest_period": "Rest Period (months)",
+    "months": "Months", "model": "Model",
+}
+
+# Volumes sheet columns read by the formulas
+_USERS, _PAYOUT, _DEPOSIT = 3, 4, 5
+
+
+def _monthly_formulas(model, volumes, row, columns):
+    """Excel formula of every summary column for the month on ``row`` of the Monthly sheet."""
+    from xlsxwriter.utility import xl_rowcol_to_cell as cell
+
+    own = {name: cell(row, col) for col, name in enumerate(columns)}
+    deposit = own["Deposit"]
+    formulas = {
+        "Active Users": f"=SUMPRODUCT({volumes(_USERS)},OpenSlots)",
+        "Users": f"=SUMPRODUCT({volumes(_USERS)},OpenSlots)",
+        "Deposit": f"=SUMPRODUCT({volumes(_DEPOSIT)},OpenSlots)",
+        "Payout": f"=SUMPRODUCT({volumes(_PAYOUT)},OpenSlots)",
+        "NII": f"={deposit}*(KIBOR+Spread)/100/12",
+    }
+    if model == COMMITTEE:
+        formulas["Fee Collected"] = f"=IF(FeeUpfront,SUMPRODUCT({volumes(_DEPOSIT)},FeeFactor),0)"
+        at_risk = deposit
+    else:
+        formulas["Fee Collected"] = (
+            f"=IF(FeeUpfront,SUMPRODUCT({volumes(_DEPOSIT)},FeeFactor),SUMPRODUCT({volumes(_PAYOUT)},FeeFactor))"
+        )
+        at_risk = own["Payout"]
+    formulas["Profit"] = f"={own['Fee Collected']}+{own['NII']}-{at_risk}*DefaultRate/100"
+    return [formulas[name] for name in columns[1:]]
+
+
+def write_live_workbook(target, forecast, config=None, progress=None):
+    """Write ``forecast`` as a formula-driven model; returns ``{sheet name: rows}``.
+
+    Inputs: the rates and the slot fee / blocking matrix, with each duration's
+    open-slot count and fee sum derived by formula.  Volumes: per-slot users,
+    payout and deposit of every (month, duration) – see
+    ``ForecastGrid.duration_volumes``.  Monthly / Yearly: SUMPRODUCT and SUM
+    formulas over both, written with their current values so readers that do
+    not recalculate still show the numbers.  The user flows themselves are
+    data; ``config``'s market, growth and allocation inputs are listed for
+    reference and need a new export when changed.
+    """
+    import xlsxwriter
+    from xlsxwriter.utility import xl_rowcol_to_cell as cell
+
+    flows = forecast.flows
+    durations = flows.durations.tolist()
+    n_durations, n_slots = len(durations), forecast.n_slots
+    n_open = forecast.slot_open.sum(axis=1)
+    fee_factor = (forecast.slot_fee / 100).sum(axis=1)
+    volumes = forecast.duration_volumes()
+    monthly, yearly = forecast.monthly(), forecast.yearly()
+
+    workbook = xlsxwriter.Workbook(target, {"nan_inf_to_errors": True})
+    bold = workbook.add_format({"bold": True})
+    header = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+    entry = workbook.add_format({"bg_color": "#FFF2CC", "border": 1})
+    try:
+        inputs = workbook.add_worksheet("Inputs")
+        inputs.set_column(0, 0, 24)
+        inputs.write(0, 0, "Rates – edit the shaded cells", bold)
+        for row, (name, label, field) in enumerate(_RATE_NAMES, 1):
+            inputs.write(row, 0, label)
+            inputs.write(row, 1, getattr(forecast, field), entry)
+            workbook.define_name(name, f"=Inputs!{cell(row, 1, True, True)}")
+
+        fee_top = len(_RATE_NAMES) + 2
+        block_top = fee_top + n_durations + 3
+        slot_header = ["Duration"] + [f"Slot {s}" for s in range(1, n_slots + 1)]
+        inputs.write(fee_top, 0, "Slot fees (%)", bold)
+        inputs.write_row(fee_top + 1, 0, slot_header + ["Open Slots", "Fee Factor"], header)
+        inputs.write(block_top, 0, "Blocked slots", bold)
+        inputs.write_row(block_top + 1, 0, slot_header, header)
+        for i, d in enumerate(durations):
+            fee_row, block_row = fee_top + 2 + i, block_top + 2 + i
+            inputs.write(fee_row, 0, d, bold)
+            inputs.write(block_row, 0, d, bold)
+            for s in range(d):
+                inputs.write(fee_row, 1 + s, float(forecast.fee_schedule[i, s]), entry)
+                inputs.write(block_row, 1 + s, bool(forecast.slot_blocked[i, s]), entry)
+            fees = f"{cell(fee_row, 1)}:{cell(fee_row, n_slots)}"
+            blocked = f"{cell(block_row, 1)}:{cell(block_row, n_slots)}"
+            inputs.write_formula(fee_row, n_slots + 1, f"=COUNTIF({blocked},FALSE)", None, int(n_open[i]))
+            inputs.write_formula(
+                fee_row, n_slots + 2, f"=SUMPRODUCT({fees},--({blocked}=FALSE))/100", None, float(fee_factor[i]),
+            )
+        first, last = fee_top + 2, fee_top + 1 + n_durations
+        for name, col in (("OpenSlots", n_slots + 1), ("FeeFactor", n_slots + 2)):
+            workbook.define_name(name, f"=Inputs!{cell(first, col, True, True)}:{cell(last, col, True, True)}")
+        inputs_rows = block_top + 2 + n_durations
+
+        if config is not None:
+            row = inputs_rows + 1
+            inputs.write(row, 0, "User flow inputs – fixed, change them in the app and export again", bold)
+            for name in FLOW_FIELDS:
+                if name in _FLOW_LABELS:
+                    value = config[name]
+                    if isinstance(value, Mapping):
+                        value = ", ".join(f"{k}: {v:g}" for k, v in value.items())
+                    row += 1
+                    inputs.write(row, 0, _FLOW_LABELS[name])
+                    inputs.write(row, 1, value)
+            row += 2
+            inputs.write(row, 0, "Allocation (%)", bold)
+            inputs.write_row(row + 1, 0, ["Duration", "Share"] + [f"Slab {s:,}" for s in config.slabs], header)
+            for i, d in enumerate(config.durations):
+                slab_alloc = config.slab_alloc.get(d, {})
+                inputs.write_row(
+                    row + 2 + i, 0,
+                    [d, config.duration_alloc.get(d, 0)] + [slab_alloc.get(s, 0) for s in config.slabs],
+                )
+            inputs_rows = row + 2 + len(config.durations)
+
+        sheet = workbook.add_worksheet("Volumes")
+        sheet.set_column(0, volumes.shape[1] - 1, 14)
+        sheet.write_row(0, 0, list(volumes.columns), header)
+        for row, values in enumerate(zip(*(volumes[name].tolist() for name in volumes.columns)), 1):
+            sheet.write_row(row, 0, values)
+
+        columns = list(monthly.columns)
+        sheet = workbook.add_worksheet("Monthly")
+        sheet.set_column(0, len(columns) - 1, 16)
+        sheet.write_row(0, 0, columns, header)
+        cached = monthly.to_numpy(dtype=np.float64)
+        for k, month in enumerate(monthly["Month"].tolist()):
+            row = k + 1
+            top, bottom = 1 + k * n_durations, (k + 1) * n_durations
+
+            def month_volumes(col):
+                return f"Volumes!{cell(top, col, True, True)}:{cell(bottom, col, True, True)}"
+
+            sheet.write(row, 0, month)
+            for col, formula in enumerate(_monthly_formulas(flows.model, month_volumes, row, columns), 1):
+                sheet.write_formula(row, col, formula, None, cached[k, col])
+
+        sheet = workbook.add_worksheet("Yearly")
+        sheet.set_column(0, len(columns) - 1, 16)
+        sheet.write_row(0, 0, list(yearly.columns), header)
+        cached = yearly.to_numpy(dtype=np.float64)
+        n_months = len(monthly)
+        for y, year in enumerate(yearly["Year"].tolist()):
+            top, bottom = 1 + 12 * y, min(12 * (y + 1), n_months)
+            sheet.write(y + 1, 0, year)
+            for col in range(1, len(columns)):
+                total = f"=SUM(Monthly!{cell(top, col)}:{cell(bottom, col)})"
+                sheet.write_formula(y + 1, col, total, None, cached[y, col])
+    finally:
+        workbook.close()
+    written = {"Inputs": inputs_rows, "Volumes": len(volumes), "Monthly": len(monthly), "Yearly": len(yearly)}
+    if progress:
+        progress(1.0, "Live model ready")
+    return written
+
+
+def live_workbook_bytes(forecast, config=None, progress=None):
+    """``(xlsx bytes, {sheet: rows})`` of the live model; see ``write_live_workbook``."""
+    out = io.BytesIO()
+    written = write_live_workbook(out, forecast, config, progress)
+    return out.getvalue(), written
+
+
+# format -> (file extension, default compression)
+COLUMNAR_FORMATS = {"parquet": ("parquet", "snappy"), "feather": ("arrow", "zstd")}
+
+# Low-cardinality key columns stored as dictionary indices
+DICTIONARY_COLUMNS = ("Month", "Year", "Duration", "Slab", "Slot", "State")
+
+
+def _check_format(fmt):
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format {fmt!r}; expected one of {tuple(COLUMNAR_FORMATS)}")
+    return fmt
+
+
+def forecast_tables(forecast):
+    """The exported tables of a forecast: the slot-level table and both summaries."""
+    return {"Forecast": forecast.to_frame(), "Monthly": forecast.monthly(), "Yearly": forecast.yearly()}
+
+
+def _index_type(size):
+    import pyarrow as pa
+
+    for index_type, limit in ((pa.int8(), 2**7), (pa.int16(), 2**15)):
+        if size <= limit:
+            return index_type
+    return pa.int32()
+
+
+def arrow_table(table):
+    """pyarrow Table of a DataFrame or ``{column: array}`` mapping.
+
+    NumPy numeric columns are wrapped, not copied; categoricals keep their
+    codes as dictionary indices and the ``DICTIONARY_COLUMNS`` keys are
+    dictionary-encoded with the smallest index type that fits.
+    """
+    import pyarrow as pa
+
+    names, columns = _columns(table)
+    arrays = []
+    for name, values in zip(names, columns):
+        if isinstance(values, pd.Categorical):
+            array = pa.DictionaryArray.from_arrays(values.codes, np.asarray(values.categories))
+        else:
+            array = pa.array(values)
+        if name in DICTIONARY_COLUMNS and not pa.types.is_dictionary(array.type):
+            array = array.dictionary_encode()
+        if pa.types.is_dictionary(array.type):
+            index_type = _index_type(len(array.dictionary))
+            array = array.cast(pa.dictionary(index_type, array.type.value_type))
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=[str(name) for name in names])
+
+
+def write_columnar(target, table, fmt="parquet", compression=None):
+    """Write one table as Parquet or Arrow IPC to a path or binary file object; returns its rows.
+
+    ``compression`` defaults to snappy for Parquet and zstd for Feather.
+    """
+    compression = compression or COLUMNAR_FORMATS[_check_format(fmt)][1]
+    data = arrow_table(table)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(data, target, compression=compression)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(data, target, compression=compression)
+    return data.num_rows
+
+
+def write_tables(directory, tables, fmt="parquet", compression=None):
+    """Write ``{name: table}`` as ``<directory>/<name>.<ext>`` files; returns ``{path: rows}``."""
+    extension = COLUMNAR_FORMATS[_check_format(fmt)][0]
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for name, table in tables.items():
+        path = os.path.join(directory, f"{name.lower()}.{extension}")
+        written[path] = write_columnar(path, table, fmt, compression)
+    return written
+
+
+def columnar_bytes(tables, fmt="parquet", progress=None):
+    """``(zip bytes, {table: rows})`` with one ``fmt`` file per table.
+
+    The members are stored uncompressed – the files are compressed already.
+    """
+    extension = COLUMNAR_FORMATS[_check_format(fmt)][0]
+    out = io.BytesIO()
+    written = {}
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as archive:
+        for i, (name, table) in enumerate(tables.items()):
+            if progress:
+                progress(i / len(tables), f"Writing {name}")
+            member = io.BytesIO()
+            written[name] = write_columnar(member, table, fmt)
+            archive.writestr(f"{name.lower()}.{extension}", member.getvalue())
+    if progress:
+        progress(1.0, f"Archive ready – {sum(written.values()):,} rows in {len(written)} tables")
+    return out.getvalue(), written
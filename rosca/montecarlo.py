@@ -0,0 +1,148 @@
+# Monte Carlo default simulation
+#
+# Instead of applying ``default_rate`` as a flat percentage, every
+# (month, duration, slab, slot) cohort draws its number of defaulting members
+# from a binomial – or, with ``dispersion`` > 0, a beta-binomial – distribution,
+# vectorized across paths.  Independent binomials with the same probability
+# sum to one binomial, so without dispersion the open slots of a (month,
+# duration, slab) cohort are pooled into a single draw; with dispersion each
+# slot draws its own beta probability.  Paths are split into chunks, each with its own
+# numpy.random.SeedSequence child stream, so results are identical however the
+# chunks are spread across processes.  Each chunk is folded into streaming
+# PathStats as it arrives; ``keep_paths=False`` then runs any number of paths
+# in constant memory.
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .engine import COMMITTEE
+from .stats import PathStats
+
+BANDS = (5, 50, 95)
+MC_METRICS = ("Loss from Default", "Profit")
+
+
+@dataclass
+class MonteCarloResult:
+    """Monthly Loss from Default and Profit over all paths.
+
+    ``stats`` always holds the streaming summaries; the full (P, M) path
+    arrays are only kept when the simulation ran with ``keep_paths=True``.
+    """
+
+    months: np.ndarray          # (M,)
+    stats: PathStats
+    seed: int
+    loss: np.ndarray = None     # (P, M)
+    profit: np.ndarray = None   # (P, M)
+
+    @property
+    def n_paths(self):
+        return self.stats.n_paths
+
+    def bands(self, metric="Profit", percentiles=BANDS):
+        """Month-by-month percentile bands, e.g. P5 / P50 / P95 columns.
+
+        Exact when the paths were kept, otherwise read from the t-digest.
+        """
+        paths = {"Profit": self.profit, "Loss from Default": self.loss}[metric]
+        if paths is None:
+            return self.stats.bands(metric, percentiles).drop(columns=["Mean", "Std"])
+        data = {"Month": self.months}
+        data.update({f"P{q:g}": band for q, band in zip(percentiles, np.percentile(paths, percentiles, axis=0))})
+        return pd.DataFrame(data)
+
+
+def _cohort_inputs(forecast, per_slot=False):
+    """Members per (month, draw) and the loss each defaulting member causes.
+
+    A draw is a (duration, slab) cohort with its open slots pooled, or with
+    ``per_slot`` one open slot of it.  Cohort sizes in the engine are
+    fractional, so each slot draws over ``ceil(users)`` members and scales the
+    loss by ``users / ceil(users)``; the expected loss then matches the
+    deterministic forecast exactly.
+    """
+    flows = forecast.flows
+    n_open = forecast.slot_open.sum(axis=1)                                   # (D,)
+    users = flows.cohort_users
+    seats = np.ceil(users)
+    scale = np.divide(users, seats, out=np.zeros_like(users), where=seats > 0)
+    # A defaulter costs their deposit (committee model) or their payout
+    exposure = flows.slabs[None, :] * (flows.durations[:, None] if flows.model == COMMITTEE else 1)
+    d_idx, b_idx = np.nonzero(flows.active & (n_open[:, None] > 0))
+    if per_slot:
+        d_idx, b_idx = np.repeat(d_idx, n_open[d_idx]), np.repeat(b_idx, n_open[d_idx])
+        members = seats[:, d_idx, b_idx].astype(np.int64)
+    else:
+        members = seats[:, d_idx, b_idx].astype(np.int64) * n_open[d_idx]
+    return members, (scale * exposure)[:, d_idx, b_idx]
+
+
+def _draw_losses(seed_seq, n_paths, members, per_member, p, dispersion):
+    rng = np.random.default_rng(seed_seq)
+    shape = (n_paths,) + members.shape
+    n = np.broadcast_to(members, shape)
+    if dispersion > 0:
+        # Beta-binomial: each slot on each path gets its own default probability
+        k = (1 - dispersion) / dispersion
+        prob = rng.beta(p * k, (1 - p) * k, size=shape) if 0 < p < 1 else np.full(shape, p)
+    else:
+        prob = np.full(shape, p)
+
+    defaults = rng.binomial(n, prob)
+    return np.einsum("pmc,mc->pm", defaults, per_member)
+
+
+def simulate_defaults(
+    forecast,
+    *,
+    paths=10000,
+    seed=0,
+    dispersion=0.0,
+    chunk_paths=500,
+    workers=0,
+    keep_paths=True,
+):
+    """Simulate Loss from Default and Profit over ``paths`` paths.
+
+    ``dispersion`` is the default correlation among the members of a slot –
+    the beta-binomial's intra-class correlation; 0 gives a plain binomial.
+    Slots draw their probabilities independently, so with dispersion each
+    open slot is a separate draw and a run costs about as many times more as
+    cohorts have open slots.  Paths are drawn ``chunk_paths`` at a time,
+    each chunk from its own child stream of ``seed``; ``workers`` > 0 spreads
+    the chunks over a process pool without changing the result.  With
+    ``keep_paths=False`` only the streaming statistics are retained.
+    """
+    members, per_member = _cohort_inputs(forecast, per_slot=dispersion > 0)
+    totals = forecast.monthly_totals()
+    income = totals["Fee Collected"] + totals["NII"]
+    p = forecast.default_rate / 100
+    months = forecast.flows.months
+
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(stream, size, members, per_member, p, dispersion)
+            for stream, size in zip(streams, sizes)]
+
+    stats = PathStats(months, MC_METRICS)
+    kept = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        chunks = pool.map(_draw_losses, *zip(*args)) if pool else (_draw_losses(*a) for a in args)
+        for loss in chunks:
+            stats.update({"Loss from Default": loss, "Profit": income[None, :] - loss})
+            if keep_paths:
+                kept.append(loss)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    result = MonteCarloResult(months=months, stats=stats, seed=seed)
+    if keep_paths:
+        result.loss = np.concatenate(kept) if kept else np.zeros((0, months.size))
+        result.profit = income[None, :] - result.loss
+    return result
@@ -0,0 +1,167 @@
+# OLAP rollup cube – every Month/Year × Duration × Slab × Slot summary by indexing
+#
+# The cube is one dense array of metrics on the (month, duration, slab, slot)
+# grid with an extra position at the end of every axis holding the marginal
+# total along it, so profit by duration for month 7 is
+# ``values[6, :-1, -1, -1, k]`` and the grand total ``values[-1, -1, -1, -1, k]``
+# – no groupby over the slot-level table.  It is built once per forecast:
+# from the grid a few months at a time, or from a legacy app's DataFrame with
+# one bincount per metric.  Years are not a separate pass either: the month
+# axis is summed over year boundaries (``np.add.reduceat``).  The cube also
+# records which cells can hold data – slots within their duration, cohorts
+# with an allocation – so breakdowns leave out combinations that cannot exist
+# instead of listing them as zero rows.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .engine import COMMITTEE, LIFECYCLE
+
+DIMS = ("Month", "Duration", "Slab", "Slot")
+
+# Additive table columns kept in the cube
+ROLLUP_METRICS = {
+    COMMITTEE: ("Active Users", "Deposit", "Fee Collected", "NII", "Profit"),
+    LIFECYCLE: ("Users", "Deposit", "Payout", "Fee Collected", "NII", "Loss from Default", "Refund", "Profit"),
+}
+
+
+def _with_totals(base):
+    """``base`` padded by one total position per axis (all but the metric axis)."""
+    out = np.zeros(tuple(n + 1 for n in base.shape[:-1]) + base.shape[-1:])
+    out[tuple(slice(0, n) for n in base.shape[:-1])] = base
+    # Summing axis by axis fills every combination of marginals
+    for axis, n in enumerate(base.shape[:-1]):
+        index = [slice(None)] * out.ndim
+        index[axis] = n
+        out[tuple(index)] = np.take(out, np.arange(n), axis=axis).sum(axis=axis)
+    return out
+
+
+@dataclass
+class RollupCube:
+    """Metrics on a labelled grid with marginal totals along every axis."""
+
+    labels: dict          # dim -> (n,) labels along its axis, in DIMS order
+    metrics: tuple        # names along the last axis
+    values: np.ndarray    # (n_1 + 1, ..., n_k + 1, K); position -1 of an axis is its total
+    valid: np.ndarray = None  # (n_1, ..., n_k) cells that can hold data; size-1 axes broadcast
+
+    @property
+    def dims(self):
+        return tuple(self.labels)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    @classmethod
+    def from_forecast(cls, forecast, month_chunk=24):
+        """Cube of a ForecastGrid, broadcasting ``month_chunk`` months of the grid at a time."""
+        flows = forecast.flows
+        metrics = ROLLUP_METRICS[flows.model]
+        base = np.zeros(forecast.shape + (len(metrics),))
+        for start in range(0, flows.months.size, month_chunk):
+            chunk = np.arange(start, min(start + month_chunk, flows.months.size))
+            sub = forecast._month_subset(chunk)
+            columns = sub.broadcast_columns()
+            for k, name in enumerate(metrics):
+                base[chunk, ..., k] = np.broadcast_to(columns[name], sub.shape)
+        labels = {
+            "Month": flows.months, "Duration": flows.durations, "Slab": flows.slabs,
+            "Slot": np.arange(1, forecast.n_slots + 1),
+        }
+        valid = (flows.active[:, :, None] & forecast.slot_valid[:, None, :])[None]
+        return cls(labels=labels, metrics=metrics, values=_with_totals(base), valid=valid)
+
+    @classmethod
+    def from_frame(cls, frame, metrics, dims=DIMS):
+        """Cube of a slot-level DataFrame: one pass of ``np.bincount`` per metric."""
+        labels, codes = {}, []
+        for dim in dims:
+            labels[dim], inverse = np.unique(np.asarray(frame[dim]), return_inverse=True)
+            codes.append(inverse.reshape(-1))
+        shape = tuple(labels[dim].size for dim in dims)
+        flat = np.ravel_multi_index(codes, shape) if frame.shape[0] else np.zeros(0, dtype=np.int64)
+        size = int(np.prod(shape))
+        base = np.stack([
+            np.bincount(flat, weights=np.asarray(frame[name], dtype=np.float64), minlength=size).reshape(shape)
+            for name in metrics
+        ], axis=-1) if metrics else np.zeros(shape + (0,))
+        valid = np.bincount(flat, minlength=size).reshape(shape) > 0
+        return cls(labels=labels, metrics=tuple(metrics), values=_with_totals(base), valid=valid)
+
+    def _position(self, dim, label):
+        hits = np.flatnonzero(self.labels[dim] == label)
+        if not hits.size:
+            raise KeyError(f"{dim} {label!r} is not in the cube")
+        return int(hits[0])
+
+    def total(self, metric, **at):
+        """``metric`` at the given labels, totalled over every dimension not named.
+
+        ``cube.total("Profit", Month=7, Duration=6)``
+        """
+        index = [-1] * len(self.dims)
+        for dim, label in at.items():
+            if dim not in self.labels:
+                raise KeyError(f"Unknown dimension {dim!r}; expected one of {self.dims}")
+            index[self.dims.index(dim)] = self._position(dim, label)
+        return float(self.values[tuple(index) + (self.metrics.index(metric),)])
+
+    def frame(self, by=("Month",), metrics=None):
+        """Long table of ``metrics`` by the ``by`` dimensions, totalled over the rest.
+
+        ``by`` may name "Year" instead of "Month"; years are summed from the
+        month axis.  Columns come in cube order (period, duration, slab, slot),
+        one row per combination of labels that can hold data.
+        """
+        by = tuple(by)
+        metrics = tuple(metrics or self.metrics)
+        period = "Year" if "Year" in by else None
+        wanted = {"Month" if dim == "Year" else dim for dim in by}
+        unknown = wanted - set(self.dims)
+        if unknown or (period and "Month" in by):
+            raise ValueError(f"Cannot break down by {by}; the cube has {self.dims}")
+
+        index = tuple(slice(0, -1) if dim in wanted else -1 for dim in self.dims)
+        block = self.values[index][..., [self.metrics.index(m) for m in metrics]]
+        names = [dim for dim in self.dims if dim in wanted]
+        labels = [self.labels[dim] for dim in names]
+        keep = None
+        if self.valid is not None:
+            keep = self.valid.any(axis=tuple(i for i, dim in enumerate(self.dims) if dim not in wanted))
+        if period:
+            years = (np.asarray(labels[0]) - 1) // 12 + 1
+            starts = np.flatnonzero(np.diff(years, prepend=years[:1] - 1))
+            block = np.add.reduceat(block, starts, axis=0) if starts.size else block
+            if keep is not None and keep.shape[0] > 1:
+                keep = np.logical_or.reduceat(keep, starts, axis=0)
+            names[0], labels[0] = "Year", years[starts]
+
+        data = {}
+        if names:
+            grids = np.meshgrid(*labels, indexing="ij")
+            data.update({name: grid.reshape(-1) for name, grid in zip(names, grids)})
+        flat = block.reshape(-1, len(metrics))
+        data.update({name: flat[:, k] for k, name in enumerate(metrics)})
+        if keep is None:
+            return pd.DataFrame(data)
+        rows = np.broadcast_to(keep, block.shape[:-1]).reshape(-1)
+        return pd.DataFrame({name: column[rows] for name, column in data.items()})
+
+
+def period_summaries(frame, metrics):
+    """``(monthly, yearly)`` totals of ``metrics`` in a slot-level DataFrame.
+
+    One pass over the table; the yearly totals are summed from the monthly
+    ones.  An empty table (a legacy app with nothing allocated) gives empty
+    summaries with the same columns.
+    """
+    metrics = list(metrics)
+    if frame.empty:
+        return pd.DataFrame(columns=["Month", *metrics]), pd.DataFrame(columns=["Year", *metrics])
+    cube = RollupCube.from_frame(frame, metrics, dims=("Month",))
+    return cube.frame(("Month",)), cube.frame(("Year",))
@@ -0,0 +1,168 @@
+# Batched scenarios – one vectorized pass over a leading scenario axis
+#
+# KIBOR, spread, default rate, monthly growth and rest period can each be given
+# per scenario.  The month recurrence runs once for the whole batch and the
+# financial totals are broadcast over (scenario, month, duration), so a sweep of
+# hundreds of combinations costs about as much as a handful of single runs.
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .engine import (
+    COMMITTEE,
+    MODELS,
+    _USERS_COLUMN,
+    _allocation_shares,
+    _slot_matrix,
+    flow_recurrence,
+    monthly_totals,
+)
+from .rejoin import combined_kernel
+
+SCENARIO_PARAMS = ("kibor", "spread", "default_rate", "monthly_growth", "rest_period")
+
+CUBE_METRICS = (
+    "Users", "Deposit", "Payout", "Fee Collected", "NII", "Loss from Default", "Refund", "Profit",
+)
+
+
+@dataclass
+class ScenarioCube:
+    """Monthly totals for every scenario, as a (scenario, month, metric) array."""
+
+    params: dict          # name -> (S,) values of each scenario parameter
+    months: np.ndarray    # (M,)
+    metrics: tuple        # names along the last axis
+    values: np.ndarray    # (S, M, K)
+
+    @property
+    def n_scenarios(self):
+        return self.values.shape[0]
+
+    def __getitem__(self, metric):
+        """(S, M) series of one metric."""
+        return self.values[:, :, self.metrics.index(metric)]
+
+    def yearly(self):
+        """(S, Y, K) totals per year."""
+        year_starts = np.flatnonzero((self.months - 1) % 12 == 0)
+        return np.add.reduceat(self.values, year_starts, axis=1)
+
+    def totals(self):
+        """One row per scenario: its parameters and horizon totals of every metric."""
+        data = {"Scenario": np.arange(self.n_scenarios)}
+        data.update({name: list(values) for name, values in self.params.items()})
+        data.update(dict(zip(self.metrics, self.values.sum(axis=1).T)))
+        return pd.DataFrame(data)
+
+    def to_frame(self):
+        """Long table: one row per (scenario, month)."""
+        n, m, _ = self.values.shape
+        data = {"Scenario": np.repeat(np.arange(n), m), "Month": np.tile(self.months, n)}
+        data.update(dict(zip(self.metrics, self.values.reshape(n * m, -1).T)))
+        return pd.DataFrame(data)
+
+
+def _column(values):
+    return np.asarray(values, dtype=np.float64)[:, None]
+
+
+def _rest_key(rest):
+    return repr(sorted(rest.items())) if isinstance(rest, Mapping) else repr(rest)
+
+
+def _scenario_values(params):
+    """Broadcast scalar / per-scenario parameters to a common length."""
+    per_scenario = {}
+    for name, value in params.items():
+        if isinstance(value, (list, tuple, np.ndarray)):
+            per_scenario[name] = list(value)
+        else:
+            per_scenario[name] = [value]
+    n = max(len(v) for v in per_scenario.values())
+    for name, values in per_scenario.items():
+        if len(values) not in (1, n):
+            raise ValueError(f"{name} has {len(values)} values; expected 1 or {n}")
+        per_scenario[name] = values * n if len(values) == 1 else values
+    return n, per_scenario
+
+
+def run_scenarios(
+    *,
+    kibor,
+    spread,
+    default_rate,
+    monthly_growth,
+    rest_period,
+    tam,
+    start_users,
+    yearly_growth,
+    durations,
+    slabs,
+    duration_alloc,
+    slab_alloc,
+    slot_fees,
+    slot_blocked,
+    fee_upfront,
+    default_fee_pct=0.0,
+    months=60,
+    model=COMMITTEE,
+):
+    """Evaluate many parameter sets at once.
+
+    Each of ``SCENARIO_PARAMS`` may be a scalar or a sequence of per-scenario
+    values (a rest period may itself be a ``{months: probability}`` mapping);
+    everything else is shared by the batch.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}; expected one of {MODELS}")
+    n, values = _scenario_values({
+        "kibor": kibor, "spread": spread, "default_rate": default_rate,
+        "monthly_growth": monthly_growth, "rest_period": rest_period,
+    })
+
+    dur = np.asarray(durations, dtype=np.int64).reshape(-1)
+    slab_arr = np.asarray(slabs, dtype=np.int64).reshape(-1)
+    d_share, b_share, _ = _allocation_shares(dur.tolist(), slab_arr.tolist(), duration_alloc, slab_alloc)
+    rejoin_weight = (d_share[:, None] * b_share).sum(axis=1)
+
+    # One kernel per distinct rest period, padded to a common width
+    kernels = {}
+    for rest in values["rest_period"]:
+        if _rest_key(rest) not in kernels:
+            kernels[_rest_key(rest)] = combined_kernel(dur, rejoin_weight, rest)
+    width = max(k.size for k in kernels.values())
+    kernel = np.zeros((n, width))
+    for i, rest in enumerate(values["rest_period"]):
+        k = kernels[_rest_key(rest)]
+        kernel[i, :k.size] = k
+
+    growth = np.asarray(values["monthly_growth"], dtype=np.float64) / 100
+    base, _, _ = flow_recurrence(model, tam, start_users, growth, tam * (yearly_growth / 100), kernel, months)
+
+    # cohort users are base × duration share × slab share, so per-duration
+    # volumes are the base times a constant per duration
+    fee_pct, blocked, valid = _slot_matrix(dur, slot_fees, slot_blocked)
+    open_slot = valid & ~blocked
+    totals = monthly_totals(
+        model, np.arange(1, months + 1), dur,
+        users_md=base[:, :, None] * (d_share[:, None] * b_share).sum(axis=1),
+        payout_md=base[:, :, None] * ((d_share[:, None] * b_share) @ slab_arr.astype(np.float64)),
+        n_open=open_slot.sum(axis=1).astype(np.float64),
+        fee_factor=(np.where(open_slot, fee_pct, 0.0) / 100).sum(axis=1),
+        nii_rate=(_column(values["kibor"]) + _column(values["spread"])) / 100 / 12,
+        default_rate=_column(values["default_rate"]),
+        fee_upfront=fee_upfront, default_fee_pct=default_fee_pct,
+    )
+    totals["Users"] = totals.pop(_USERS_COLUMN[model])
+    return ScenarioCube(
+        params={name: np.array(v, dtype=object if name == "rest_period" else np.float64)
+                for name, v in values.items()},
+        months=np.arange(1, months + 1),
+        metrics=CUBE_METRICS,
+        values=np.stack([totals[name] for name in CUBE_METRICS], axis=-1),
+    )
+
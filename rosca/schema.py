@@ -0,0 +1,50 @@
+# Typed schema for slot-level tables built outside the engine
+#
+# The engine writes its table straight into FRAME_DTYPES.  The legacy apps
+# still build theirs from lists of dicts, which pandas types as int64 keys
+# and float64 values.  compact_frame casts such a table's key columns to the
+# same schema: int16 periods, int8 durations and slots, categorical slabs
+# and states, and bool flags.  Only the keys shrink: the float64 money and
+# user columns stay as they are and hold most of the bytes, so a compacted
+# table is about two thirds of its legacy size, and groupbys on it take
+# about as long as before.  footprint reports what a table holds in memory.
+
+import numpy as np
+
+from .engine import FRAME_DTYPES
+
+
+def _fits(values, dtype):
+    info = np.iinfo(dtype)
+    return values.size == 0 or (info.min <= values.min() and values.max() <= info.max)
+
+
+def compact_frame(frame, dtypes=FRAME_DTYPES):
+    """``frame`` with the key columns named in ``dtypes`` cast to their compact types.
+
+    Value columns are left as they are.  An integer key whose values do not
+    fit its compact type keeps its own type.
+    """
+    casts = {}
+    for name, dtype in dtypes.items():
+        if name not in frame.columns or frame[name].dtype == dtype:
+            continue
+        kind = frame[name].dtype.kind
+        if dtype == "category":
+            casts[name] = dtype
+        elif np.dtype(dtype).kind == "b":
+            if kind in "biu":
+                casts[name] = dtype
+        elif kind in "iu" and _fits(frame[name].to_numpy(), dtype):
+            casts[name] = dtype
+    return frame.astype(casts) if casts else frame
+
+
+def footprint(frame):
+    """Bytes per column of ``frame``, counting the contents of object and string columns."""
+    return frame.memory_usage(index=False, deep=True)
+
+
+def describe_footprint(frame):
+    """One-line size summary of ``frame`` for a caption."""
+    return f"{len(frame):,} rows · {footprint(frame).sum() / 1e6:,.1f} MB in memory"
@@ -0,0 +1,211 @@
+# Streaming statistics over simulation paths
+#
+# Large Monte Carlo or sweep runs should not keep every path's monthly series
+# in memory.  The accumulators here take batches of (paths, months) arrays,
+# fold them into fixed-size state and can be merged, so memory stays constant
+# however many paths are run:
+#
+#   RunningMoments  – count / mean / variance (Welford, batch form of Chan et al.)
+#   QuantileSketch  – merging t-digest with one digest per month, vectorized
+#   Extremes        – min / max with the id of the path that produced them
+#   PathStats       – all three for several metrics, with fan-chart bands
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """Running count, mean and variance of equally shaped observations."""
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def update(self, batch):
+        """Fold in ``batch`` of shape ``(n, *shape)``."""
+        batch = np.asarray(batch, dtype=np.float64)
+        n = batch.shape[0]
+        if not n:
+            return self
+        mean = batch.mean(axis=0)
+        m2 = ((batch - mean) ** 2).sum(axis=0)
+        self._combine(n, mean, m2)
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other._m2)
+        return self
+
+    def _combine(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        """Sample variance (``ddof=1``)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else np.full_like(self._m2, np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Merging t-digest, one digest per column, in fixed-size arrays.
+
+    Every column keeps ``compression + 1`` centroids.  A batch is merged by
+    sorting the old centroids together with the new values and regrouping them
+    into buckets of the arcsine scale function, which keeps the buckets small
+    near the tails – where P5 / P95 are read – and wide in the middle.
+    """
+
+    def __init__(self, columns, compression=200):
+        self.compression = compression
+        self.means = np.zeros((columns, compression + 1))
+        self.weights = np.zeros((columns, compression + 1))
+        self.min = np.full(columns, np.inf)
+        self.max = np.full(columns, -np.inf)
+
+    @property
+    def count(self):
+        return self.weights[0].sum() if self.weights.size else 0.0
+
+    def update(self, batch):
+        """Fold in ``batch`` of shape ``(n, columns)``."""
+        batch = np.asarray(batch, dtype=np.float64)
+        if batch.shape[0]:
+            self._merge(batch.T, np.ones_like(batch.T))
+            self.min = np.minimum(self.min, batch.min(axis=0))
+            self.max = np.maximum(self.max, batch.max(axis=0))
+        return self
+
+    def merge(self, other):
+        self._merge(other.means, other.weights)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def _merge(self, means, weights):
+        values = np.concatenate([self.means, means], axis=1)
+        weights = np.concatenate([self.weights, weights], axis=1)
+        order = np.argsort(values, axis=1, kind="stable")
+        values = np.take_along_axis(values, order, axis=1)
+        weights = np.take_along_axis(weights, order, axis=1)
+
+        cum = np.cumsum(weights, axis=1)
+        total = cum[:, -1:]
+        q = np.divide(cum - weights / 2, total, out=np.zeros_like(cum), where=total > 0)
+        bucket = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)).astype(np.int64)
+        bucket = np.minimum(bucket, self.compression)
+
+        # One bincount over (column, bucket) pairs regroups every digest at once
+        columns, width = self.weights.shape
+        flat = (bucket + np.arange(columns)[:, None] * width).ravel()
+        size = columns * width
+        w = np.bincount(flat, weights.ravel(), minlength=size).reshape(columns, width)
+        wx = np.bincount(flat, (weights * values).ravel(), minlength=size).reshape(columns, width)
+        self.weights = w
+        self.means = np.divide(wx, w, out=np.zeros_like(wx), where=w > 0)
+
+    def quantile(self, percentiles):
+        """``(len(percentiles), columns)`` estimates for percentiles in [0, 100]."""
+        q = np.atleast_1d(np.asarray(percentiles, dtype=np.float64)) / 100
+        out = np.full((q.size, self.weights.shape[0]), np.nan)
+        for col, (means, weights) in enumerate(zip(self.means, self.weights)):
+            keep = weights > 0
+            if not keep.any():
+                continue
+            means, weights = means[keep], weights[keep]
+            cum = np.cumsum(weights)
+            mids = (cum - weights / 2) / cum[-1]
+            xp = np.concatenate([[0.0], mids, [1.0]])
+            fp = np.concatenate([[self.min[col]], means, [self.max[col]]])
+            out[:, col] = np.interp(q, xp, fp)
+        return out
+
+
+class Extremes:
+    """Running min / max with the id of the path that reached each."""
+
+    def __init__(self, shape):
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.argmin = np.full(shape, -1, dtype=np.int64)
+        self.argmax = np.full(shape, -1, dtype=np.int64)
+
+    def update(self, batch, ids):
+        """Fold in ``batch`` of shape ``(n, *shape)`` whose paths have ``ids``."""
+        batch = np.asarray(batch, dtype=np.float64)
+        if not batch.shape[0]:
+            return self
+        ids = np.asarray(ids)
+        lo, hi = batch.argmin(axis=0), batch.argmax(axis=0)
+        lo_val = np.take_along_axis(batch, lo[None], axis=0)[0]
+        hi_val = np.take_along_axis(batch, hi[None], axis=0)[0]
+        lower, higher = lo_val < self.min, hi_val > self.max
+        self.min = np.where(lower, lo_val, self.min)
+        self.argmin = np.where(lower, ids[lo], self.argmin)
+        self.max = np.where(higher, hi_val, self.max)
+        self.argmax = np.where(higher, ids[hi], self.argmax)
+        return self
+
+
+class PathStats:
+    """Streaming moments, quantiles and extremes of monthly metric series.
+
+    ``update({"Profit": (n, M) array, ...})`` takes one batch of paths; path
+    ids are assigned in arrival order unless given.
+    """
+
+    def __init__(self, months, metrics, compression=200):
+        self.months = np.asarray(months)
+        self.metrics = tuple(metrics)
+        size = self.months.size
+        self.moments = {name: RunningMoments(size) for name in self.metrics}
+        self.sketches = {name: QuantileSketch(size, compression) for name in self.metrics}
+        self.extremes = {name: Extremes(size) for name in self.metrics}
+        self.n_paths = 0
+
+    def update(self, batch, ids=None):
+        n = len(next(iter(batch.values())))
+        if ids is None:
+            ids = np.arange(self.n_paths, self.n_paths + n)
+        for name in self.metrics:
+            values = batch[name]
+            self.moments[name].update(values)
+            self.sketches[name].update(values)
+            self.extremes[name].update(values, ids)
+        self.n_paths += n
+        return self
+
+    def merge(self, other):
+        for name in self.metrics:
+            self.moments[name].merge(other.moments[name])
+            self.sketches[name].merge(other.sketches[name])
+            ext, theirs = self.extremes[name], other.extremes[name]
+            lower, higher = theirs.min < ext.min, theirs.max > ext.max
+            ext.min, ext.argmin = np.where(lower, theirs.min, ext.min), np.where(lower, theirs.argmin, ext.argmin)
+            ext.max, ext.argmax = np.where(higher, theirs.max, ext.max), np.where(higher, theirs.argmax, ext.argmax)
+        self.n_paths += other.n_paths
+        return self
+
+    def bands(self, metric, percentiles=(5, 50, 95)):
+        """Month, P.. columns, Mean and Std – the fan-chart table."""
+        data = {"Month": self.months}
+        data.update({f"P{q:g}": band for q, band in zip(percentiles, self.sketches[metric].quantile(percentiles))})
+        data["Mean"] = self.moments[metric].mean
+        data["Std"] = self.moments[metric].std
+        return pd.DataFrame(data)
+
+    def extremes_frame(self, metric):
+        """Month, Min, Min Path, Max, Max Path."""
+        ext = self.extremes[metric]
+        return pd.DataFrame({
+            "Month": self.months, "Min": ext.min, "Min Path": ext.argmin,
+            "Max": ext.max, "Max Path": ext.argmax,
+        })
@@ -0,0 +1,106 @@
+# Process-pool parameter sweeps with results in shared memory
+#
+# For grids too large or too heterogeneous for one run_scenarios batch (slab
+# mixes × fee schedules × rates), the grid is split into chunks that run in a
+# ProcessPoolExecutor.  Workers write their monthly totals straight into one
+# multiprocessing.shared_memory block instead of pickling DataFrames back.
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .config import ForecastConfig
+from .engine import _USERS_COLUMN, run_forecast
+from .scenarios import CUBE_METRICS, ScenarioCube
+
+
+def expand_grid(base, **options):
+    """Cartesian product of ``options`` applied on top of the ``base`` config.
+
+    ``expand_grid(cfg, kibor=[10, 12], slab_alloc=[mix_a, mix_b])`` gives four
+    configs.  A ForecastConfig base gives validated ForecastConfigs.
+    """
+    names = list(options)
+    combos = (dict(zip(names, combo)) for combo in itertools.product(*options.values()))
+    if isinstance(base, ForecastConfig):
+        return [base.replace(**combo) for combo in combos]
+    return [dict(base, **combo) for combo in combos]
+
+
+def _attach(name):
+    # Workers share the parent's resource tracker, which already owns the
+    # block; on Python < 3.13 re-registering it there is a harmless no-op
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _monthly_values(config, metrics):
+    totals = run_forecast(**config).monthly_totals()
+    totals["Users"] = totals.pop(_USERS_COLUMN[config.get("model", "committee")])
+    return np.stack([totals[name] for name in metrics], axis=-1)
+
+
+def _fill(out, start, configs, metrics):
+    for i, config in enumerate(configs, start):
+        out[i] = _monthly_values(config, metrics)
+
+
+def _run_chunk(shm_name, shape, start, configs, metrics):
+    shm = _attach(shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        _fill(out, start, configs, metrics)
+        del out
+    finally:
+        shm.close()
+    return len(configs)
+
+
+def run_sweep(configs, *, workers=None, chunk_size=16, metrics=CUBE_METRICS):
+    """Run every config in ``configs`` (ForecastConfigs or ``run_forecast`` keyword dicts).
+
+    ``workers`` is the process count (default: CPU count; ``0`` runs inline)
+    and ``chunk_size`` the number of configs per task.  All configs must share
+    the same horizon.  Returns a ScenarioCube indexed by config position,
+    with each config's digest alongside when ForecastConfigs were given.
+    """
+    configs = list(configs)
+    months = {c.get("months", 60) for c in configs}
+    if len(months) > 1:
+        raise ValueError("All configs in a sweep must use the same horizon")
+    n_months = months.pop() if months else 60
+    shape = (len(configs), n_months, len(metrics))
+
+    chunks = [(start, configs[start:start + chunk_size]) for start in range(0, len(configs), chunk_size)]
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    try:
+        if workers == 0:
+            for start, chunk in chunks:
+                _fill(out, start, chunk, metrics)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_run_chunk, shm.name, shape, start, chunk, metrics)
+                           for start, chunk in chunks]
+                for future in futures:
+                    future.result()
+        values = out.copy()
+    finally:
+        # The view must go before the block can be closed
+        del out
+        shm.close()
+        shm.unlink()
+
+    params = {"config": np.arange(len(configs))}
+    if configs and all(isinstance(c, ForecastConfig) for c in configs):
+        params["digest"] = np.array([c.digest for c in configs])
+    return ScenarioCube(
+        params=params,
+        months=np.arange(1, n_months + 1),
+        metrics=tuple(metrics),
+        values=values,
+    )
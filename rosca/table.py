@@ -0,0 +1,86 @@
+# Server-side paging of the slot-level forecast table
+#
+# The table has one row per (month, duration, slab, slot) and runs to hundreds
+# of thousands of rows, so the apps show it a filtered, sorted page at a time
+# instead of sending it whole.  Rows are laid out month-major over a fixed
+# per-month template (ForecastGrid.row_template), which makes the month
+# offsets implicit: a filter is a month range, found by binary search, plus
+# the template offsets whose duration / slab / slot / blocked keys match.  Row
+# ``i`` of the filtered table then maps straight to its table position, so a
+# page costs O(log M + k) and only its k rows are computed
+# (ForecastGrid.take).  Sorting by a column ranks the filtered rows once; the
+# ranking can be cached and handed back through ``order``.
+
+import numpy as np
+import pandas as pd
+
+
+class TableView:
+    """Filtered, optionally sorted view of ``forecast``'s slot-level table.
+
+    ``months`` is an inclusive ``(first, last)`` month range; ``durations``,
+    ``slabs`` and ``slots`` are collections of allowed values; ``blocked``
+    keeps only blocked (``True``) or open (``False``) slots.  ``None`` or an
+    empty collection means no filter.
+    """
+
+    def __init__(self, forecast, *, months=None, durations=None, slabs=None, slots=None, blocked=None):
+        flows = forecast.flows
+        self.forecast = forecast
+        template = forecast.row_template()
+        d_idx, b_idx, s_idx = np.unravel_index(template, forecast.shape[1:])
+        self.template_size = template.size
+
+        keep = np.ones(template.size, dtype=bool)
+        if durations:
+            keep &= np.isin(flows.durations[d_idx], list(durations))
+        if slabs:
+            keep &= np.isin(flows.slabs[b_idx], list(slabs))
+        if slots:
+            keep &= np.isin(s_idx + 1, list(slots))
+        if blocked is not None:
+            keep &= forecast.slot_blocked[d_idx, s_idx] == bool(blocked)
+        self.offsets = np.flatnonzero(keep)
+
+        first, last = months if months else (None, None)
+        self.month_lo = 0 if first is None else int(np.searchsorted(flows.months, first, side="left"))
+        self.month_hi = flows.months.size if last is None else int(np.searchsorted(flows.months, last, side="right"))
+        self.key = (
+            tuple(months) if months else None, tuple(sorted(durations or ())), tuple(sorted(slabs or ())),
+            tuple(sorted(slots or ())), blocked,
+        )
+        self.order = None  # filtered row numbers in display order; None is table order
+
+    def __len__(self):
+        return max(self.month_hi - self.month_lo, 0) * self.offsets.size
+
+    def positions(self, start=0, stop=None):
+        """Table positions of filtered rows ``start:stop`` in table order."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        return self._table_positions(np.arange(start, max(stop, start), dtype=np.int64))
+
+    def _table_positions(self, i):
+        month, j = np.divmod(i, max(self.offsets.size, 1))
+        return (self.month_lo + month) * self.template_size + self.offsets[j]
+
+    def sort_order(self, column, descending=False):
+        """Filtered row numbers ranked by ``column``; ties keep table order."""
+        positions = self.positions()
+        values = self.forecast.take(positions, [column])[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.cat.codes
+        values = np.asarray(values, dtype=np.float64)
+        return np.argsort(-values if descending else values, kind="stable")
+
+    def n_pages(self, size):
+        return -(-len(self) // size)
+
+    def page(self, number, size):
+        """Rows of 0-based page ``number`` as a DataFrame with the table's columns."""
+        start = number * size
+        stop = min(start + size, len(self))
+        if self.order is None:
+            rows = self.positions(start, stop)
+        else:
+            rows = self._table_positions(self.order[start:stop])
+        return self.forecast.take(rows)
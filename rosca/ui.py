@@ -0,0 +1,400 @@
+# Streamlit glue – the apps' cached rerun pipeline
+#
+# Streamlit reruns the whole script on every widget change.  The forecast is
+# split into stages, each cached on only the inputs it depends on:
+#
+#   flows       market / growth / rest / allocations / horizon   (user recurrence)
+#   financials  + slot fees, blocking and rates                   (ForecastGrid)
+#               – a rerun that only edits slots patches the previous grid, and
+#                 forecasts found in memory or in the disk cache skip both stages
+#   summaries   monthly / yearly totals of a forecast
+#   rollup      the cube behind summaries broken down by duration / slab / slot
+#   table       the slot-level forecast table – paged on the server for display,
+#               built whole only inside an export job
+#   export      full Excel data, the formula-driven live model or Parquet / Feather
+#               tables – built on request in a background thread
+#   simulation  the Monte Carlo default bands
+#   charts      rendered chart PNGs, in their own small LRU (chart_cache)
+#
+# so moving a rate slider reuses the cached user flows and only recomputes the
+# financial stages.  Stage results live in one process-wide SharedResultCache
+# keyed on the ForecastConfig digests (the flow stage on ``flows_digest``):
+# sessions with identical configs share the same objects, within a memory
+# ceiling, instead of each holding copies.  Cached values are read-only.
+#
+# The apps lay out their views with st.tabs(..., on_change="rerun"): only the
+# selected tab reports ``open``, and each app runs a tab's work – including
+# the summaries, which the Forecast tab does not need – only behind that check.
+# This is the only module of the package that imports streamlit.
+
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from .cache import ResultCache, SharedResultCache
+from .config import FIELDS, ForecastConfig
+from .engine import compute_grid, compute_user_flows
+from .export import XLSX_MIME, ZIP_MIME, columnar_bytes, live_workbook_bytes, workbook_bytes
+from .montecarlo import simulate_defaults
+from .rollup import RollupCube
+from .table import TableView
+
+
+class StageTimer:
+    """Wall-clock time per pipeline stage of one rerun."""
+
+    def __init__(self):
+        self.timings = {}
+        self.notes = []
+
+    @contextmanager
+    def __call__(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + (time.perf_counter() - t0) * 1e3
+
+    def frame(self):
+        return pd.DataFrame({"Stage": list(self.timings), "Time (ms)": list(self.timings.values())})
+
+    def show(self):
+        stats = shared_cache().stats()
+        self.notes.append(
+            f"Shared cache: {stats['hit_rate']:.0%} hit rate · {stats['entries']} entries · "
+            f"{stats['bytes'] / 2**20:.1f} of {stats['max_bytes'] / 2**20:.0f} MB"
+        )
+        with st.sidebar.expander("⏱️ Stage Timings"):
+            st.dataframe(self.frame(), hide_index=True)
+            for note in self.notes:
+                st.caption(note)
+
+
+@st.cache_resource
+def shared_cache():
+    """Process-wide in-memory result cache shared by every session.
+
+    Sized by ``ROSCA_SHARED_CACHE_MB`` (default 256) with entries expiring
+    after ``ROSCA_SHARED_CACHE_TTL`` seconds (default one hour).
+    """
+    return SharedResultCache(
+        max_bytes=int(float(os.environ.get("ROSCA_SHARED_CACHE_MB", 256)) * 2**20),
+        ttl=float(os.environ.get("ROSCA_SHARED_CACHE_TTL", 3600)),
+    )
+
+
+@st.cache_resource
+def chart_cache():
+    """Process-wide LRU of rendered chart PNGs, kept apart from the forecast results.
+
+    Sized by ``ROSCA_CHART_CACHE_MB`` (default 32) and sharing the results'
+    TTL, so a burst of charts never evicts a forecast.
+    """
+    return SharedResultCache(
+        max_bytes=int(float(os.environ.get("ROSCA_CHART_CACHE_MB", 32)) * 2**20),
+        ttl=float(os.environ.get("ROSCA_SHARED_CACHE_TTL", 3600)),
+    )
+
+
+def cached_chart(key, render):
+    """PNG bytes of the chart under ``key`` – e.g. ``(digest, metric)`` – drawn by ``render()`` on a miss."""
+    return chart_cache().get_or_compute(key, render)
+
+
+@st.cache_resource
+def disk_cache():
+    """Process-wide on-disk forecast cache (see ``rosca.cache``)."""
+    return ResultCache()
+
+
+def cached_flows(config):
+    """User flows of ``config``, shared by every config with the same flow inputs."""
+    return shared_cache().get_or_compute(
+        ("flows", config.flows_digest), lambda: compute_user_flows(**config.flow_inputs())
+    )
+
+
+def _slot_diff(old, new):
+    return {d: {s: v for s, v in slots.items() if old.get(d, {}).get(s) != v}
+            for d, slots in new.items() if slots != old.get(d)}
+
+
+def forecast_stage(config, timer):
+    """Forecast for this rerun, timed as the flows / financials / disk cache stages.
+
+    In order of preference: the shared in-memory grid for this config, the
+    previous rerun's grid patched with ``ForecastGrid.update_slots`` when only
+    slot fees or blocks changed, a forecast stored in the disk cache, or the
+    flows and grid stages.  Patched and computed grids are stored on disk.
+
+    The session keeps only the previous config; its grid is looked up in the
+    shared cache, so no session holds a grid outside the cache's ceiling.
+    Grids enter the cache with their monthly totals computed, which keeps the
+    size charged for them accurate.
+    """
+    previous = st.session_state.get("_rosca_forecast")
+    previous_grid = None
+    if previous is not None and ("grid", previous.digest) in shared_cache():
+        previous_grid = shared_cache().get(("grid", previous.digest))
+    same_rates = previous_grid is not None and all(
+        previous[name] == config[name] for name in FIELDS if name not in ("slot_fees", "slot_blocked")
+    )
+    cache = disk_cache()
+
+    def patch():
+        with timer("financials"):
+            patched = previous_grid.update_slots(
+                slot_fees=_slot_diff(previous.slot_fees, config.slot_fees),
+                slot_blocked=_slot_diff(previous.slot_blocked, config.slot_blocked),
+            )
+        with timer("disk cache"):
+            cache.save(config, patched)
+        return patched
+
+    def load_or_compute():
+        with timer("disk cache"):
+            stored = cache.load(config)
+        if stored is None:
+            with timer("flows"):
+                flows = cached_flows(config)
+            with timer("financials"):
+                stored = compute_grid(flows, **config.rate_inputs())
+            with timer("disk cache"):
+                cache.save(config, stored)
+        stored.monthly_totals()
+        return stored
+
+    forecast = shared_cache().get_or_compute(("grid", config.digest), patch if same_rates else load_or_compute)
+    timer.notes.append(f"Disk cache: {cache.hits} hits / {cache.misses} misses")
+    st.session_state["_rosca_forecast"] = config
+    return forecast
+
+
+def cached_summaries(forecast, config):
+    """``(monthly, yearly)`` summary frames."""
+    return shared_cache().get_or_compute(("summaries", config.digest), lambda: (forecast.monthly(), forecast.yearly()))
+
+
+def cached_rollup(forecast, config):
+    return shared_cache().get_or_compute(("rollup", config.digest), lambda: RollupCube.from_forecast(forecast))
+
+
+def summary_view(forecast, config, period, summary):
+    """Monthly / Yearly tab: ``summary``, or its breakdown by the chosen dimensions off the rollup cube."""
+    by = st.multiselect("Break down by", ["Duration", "Slab", "Slot"], key=f"{period.lower()}_breakdown")
+    if by:
+        summary = cached_rollup(forecast, config).frame((period, *by), metrics=list(summary.columns[1:]))
+    st.dataframe(summary, hide_index=True)
+
+
+def slot_table(forecast, config, page_sizes=(50, 100, 500)):
+    """Forecast tab grid: filter, sort and page the slot table here, send only the visible page."""
+    flows = forecast.flows
+    first, last = int(flows.months[0]), int(flows.months[-1])
+    c1, c2, c3, c4 = st.columns(4)
+    months = c1.slider("Months", first, last, (first, last), key="grid_months") if last > first else None
+    durations = c2.multiselect("Duration", flows.durations.tolist(), key="grid_durations")
+    slabs = c3.multiselect("Slab", flows.slabs.tolist(), key="grid_slabs")
+    slots = c4.multiselect("Slot", list(range(1, forecast.n_slots + 1)), key="grid_slots")
+    c1, c2, c3, c4 = st.columns(4)
+    state = c1.selectbox("Slots", ["All", "Open", "Blocked"], key="grid_blocked")
+    sort = c2.selectbox("Sort by", ["Table order", *forecast.table_columns], key="grid_sort")
+    descending = c3.toggle("Descending", key="grid_descending")
+    size = c4.selectbox("Rows per page", page_sizes, index=1, key="grid_page_size")
+
+    view = TableView(
+        forecast, months=months, durations=durations, slabs=slabs, slots=slots,
+        blocked=None if state == "All" else state == "Blocked",
+    )
+    if sort != "Table order":
+        view.order = shared_cache().get_or_compute(
+            ("table order", config.digest, view.key, sort, descending), lambda: view.sort_order(sort, descending)
+        )
+    n_pages = max(view.n_pages(size), 1)
+    if st.session_state.get("grid_page", 1) > n_pages:
+        st.session_state["grid_page"] = n_pages
+    page = st.number_input(f"Page (of {n_pages:,})", 1, n_pages, key="grid_page")
+    start = (page - 1) * size
+    st.dataframe(view.page(page - 1, size), hide_index=True)
+    st.caption(
+        f"Rows {min(start + 1, len(view)):,}–{min(start + size, len(view)):,} of {len(view):,} "
+        f"matching · {forecast.n_rows:,} in the table ({forecast.table_nbytes / 1e6:,.1f} MB)"
+    )
+
+
+class _ExportJob:
+    def __init__(self):
+        self.fraction = 0.0
+        self.message = "Queued"
+        self.future = None
+
+    def report(self, fraction, message):
+        self.fraction, self.message = fraction, message
+
+
+@st.cache_resource
+def _export_workers():
+    """Background workbook builder shared by every session, with its running jobs."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="rosca-export"), {}, threading.Lock()
+
+
+def _background_export(key, file_name, label, build, *args, requires=("xlsxwriter",), mime=XLSX_MIME, unit="sheet"):
+    """Download button for ``build(*args, progress)``, built on request in a background thread.
+
+    ``build`` returns ``(bytes, {sheet or table: rows})``.  The first click on
+    "Prepare export" queues the file; a fragment then polls the job and
+    redraws its progress bar without holding the script thread, so widgets
+    stay live while the file is built.  When the job finishes the bytes go to
+    the shared cache under ``key`` and the app reruns to show the download
+    button; later reruns and other sessions download them without
+    rebuilding.  The session also keeps the bytes until they are downloaded,
+    so a file larger than the cache, or evicted before the rerun, is not
+    lost.  A job that raises is reported above a fresh "Prepare export"
+    button to retry with.  A job already running for the same key is joined
+    instead of started again.  The ``requires`` modules are imported up
+    front, so a missing optional dependency raises ImportError here rather
+    than in the worker.
+    """
+    for module in requires:
+        importlib.import_module(module)
+    cache = shared_cache()
+    pending = _pending_exports()
+    if key in cache:
+        pending.pop(key, None)
+        data = cache.get(key)
+    else:
+        data = pending.get(key)
+    if data is None:
+        pool, jobs, lock = _export_workers()
+        with lock:
+            job = jobs.get(key)
+        if job is None:
+            error = st.session_state.get("_rosca_export_errors", {}).pop(key, None)
+            if error:
+                st.error(f"❌ Export failed – {error}. Try again.")
+            if not st.button("⚙️ Prepare export", key=f"export_{file_name}"):
+                return
+            with lock:
+                job = jobs.setdefault(key, _ExportJob())
+                if job.future is None:
+                    job.future = pool.submit(build, *args, job.report)
+        _export_progress(key)
+        return
+    content, written = data
+    st.download_button(
+        label, content, file_name, mime=mime, key=f"download_{file_name}",
+        on_click=lambda: pending.pop(key, None),
+    )
+    st.caption(f"{sum(written.values()):,} rows in {len(written)} {unit}{'s' if len(written) != 1 else ''}")
+    if key in pending:
+        st.caption("Not held by the shared cache – kept for this session until downloaded")
+
+
+def _pending_exports():
+    """This session's finished exports, held until downloaded or cached."""
+    return st.session_state.setdefault("_rosca_exports", {})
+
+
+@st.fragment(run_every=0.25)
+def _export_progress(key):
+    """Progress of the export job under ``key``; reruns the app once the job is over."""
+    _, jobs, lock = _export_workers()
+    with lock:
+        job = jobs.get(key)
+    if job is not None and not job.future.done():
+        st.progress(min(job.fraction, 1.0), text=job.message)
+        return
+    if job is not None:
+        with lock:
+            jobs.pop(key, None)
+        try:
+            result = job.future.result()
+        except Exception as exc:  # reported on the rerun, next to a fresh "Prepare export"
+            st.session_state.setdefault("_rosca_export_errors", {})[key] = f"{type(exc).__name__}: {exc}"
+        else:
+            _pending_exports()[key] = result
+            shared_cache().put(key, result)
+    st.rerun()
+
+
+def _build_tables(write, tables, *args):
+    """``write(tables, *args)`` with every callable table – e.g. ``forecast.to_frame`` – built first.
+
+    Runs in the export worker, so a lazy table exists only inside the job.
+    """
+    return write({name: table() if callable(table) else table for name, table in tables.items()}, *args)
+
+
+def excel_download(sheets, digest, file_name, label="📥 Download Excel"):
+    """Excel download of ``{name: frame}``, streamed in the background (see ``rosca.export``).
+
+    ``digest`` keys the cached bytes: a ForecastConfig digest, or
+    ``rosca.export.frame_digest`` of the exported frames.  A sheet may be
+    given as a callable returning its frame; it is only called once the
+    export is requested, in the worker.
+    """
+    _background_export(("excel", digest), file_name, label, _build_tables, workbook_bytes, dict(sheets))
+
+
+def live_model_download(forecast, config, file_name, label="📥 Download Live Model"):
+    """Formula-driven workbook of ``forecast`` – Inputs, Volumes, Monthly, Yearly."""
+    _background_export(("live model", config.digest), file_name, label, live_workbook_bytes, forecast, config)
+
+
+def columnar_download(tables, digest, fmt, file_name, label="📥 Download Tables"):
+    """Zip of ``{name: frame}`` as Parquet or Feather files (``fmt``), keyed like ``excel_download``."""
+    _background_export(
+        (fmt, digest), file_name, label, _build_tables, columnar_bytes, dict(tables), fmt,
+        requires=("pyarrow",), mime=ZIP_MIME, unit="table",
+    )
+
+
+def cached_simulation(forecast, config, paths, seed, dispersion):
+    """Streaming Monte Carlo default simulation (see ``rosca.montecarlo``)."""
+    return shared_cache().get_or_compute(
+        ("simulation", config.digest, paths, seed, dispersion),
+        lambda: simulate_defaults(forecast, paths=paths, seed=seed, dispersion=dispersion, keep_paths=False),
+    )
+
+
+# Paths × months a simulation may draw while the script waits on it: ~6 s
+INTERACTIVE_PATH_MONTHS = 600_000
+# Cost of a path-month with dispersion (one draw per open slot) relative to
+# one without, measured with every duration selected
+PER_SLOT_COST = 8
+
+
+def simulation_paths_input(months, per_slot=False):
+    """Sidebar path count for the Monte Carlo run, capped to keep it interactive.
+
+    The simulation runs in the script thread at a roughly fixed cost per
+    path-month, so the ceiling falls with the horizon: 10,000 paths over 60
+    months, 1,000 over 360.  ``per_slot`` (a run with dispersion) divides the
+    budget by ``PER_SLOT_COST`` and counts paths in hundreds.
+    """
+    budget, step = (INTERACTIVE_PATH_MONTHS // PER_SLOT_COST, 100) if per_slot else (INTERACTIVE_PATH_MONTHS, 1000)
+    ceiling = max(step, budget // months // step * step)
+    return st.sidebar.number_input(
+        "Simulation Paths", step, ceiling, min(10000, ceiling), step=step,
+        help=f"Up to {ceiling:,} paths over a {months}-month horizon",
+    )
+
+
+def config_or_prompt(**inputs):
+    """``ForecastConfig(**inputs)``, or ``None`` after a prompt to finish the sidebar setup.
+
+    An incomplete setup – e.g. the default 0% allocations – is the app's
+    starting state rather than an error, so the page keeps rendering.
+    """
+    try:
+        return ForecastConfig(**inputs)
+    except ValueError as exc:
+        problems = str(exc).removeprefix("Invalid forecast config: ")
+        st.info(f"ℹ️ Finish the setup in the sidebar to see the forecast – {problems}.")
+        return None
@@ -4,9 +4,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import io
-import xlsxwriter
+
+from rosca import canonical_digest
+from rosca.charts import line_chart_png
+from rosca.export import frame_digest
+from rosca.schema import compact_frame, describe_footprint
+from rosca.ui import cached_chart, excel_download
 
 # -----------------------------
 # Configuration Inputs
@@ -31,9 +34,17 @@ for d in durations:
 # -----------------------------
 # Forecast Generation
 # -----------------------------
+# The table numbers months from 1 (int16, sorts chronologically); this is the
+# calendar they stand for
+months = pd.date_range("2025-01-01", periods=60, freq='MS')
+calendar = pd.DataFrame({"Month": np.arange(1, months.size + 1, dtype=np.int16), "Period": months.strftime("%b %Y")})
+
+# Keyed on a digest of the slot matrices instead of hashing the nested dicts.
+# The digest ignores mapping order, but rows follow the order the durations
+# were picked in, so that order is part of the key.
 @st.cache_data
-def generate_forecast(slot_fees, slot_blocks):
-    months = pd.date_range("2025-01-01", periods=60, freq='MS')
+def generate_forecast(config_digest, _slot_fees, _slot_blocks):
+    slot_fees, slot_blocks = _slot_fees, _slot_blocks
     forecast_data = []
 
     base_users = 200000
@@ -44,7 +55,7 @@ def generate_forecast(slot_fees, slot_blocks):
 
     active_users = base_users
 
-    for i, month in enumerate(months):
+    for i in range(months.size):
         for duration in slot_fees:
             for slot in slot_fees[duration]:
                 if slot_blocks[duration][slot]:
@@ -61,7 +72,7 @@ def generate_forecast(slot_fees, slot_blocks):
                 profit = fee_collected + nii - (default_rate * deposits)
 
                 forecast_data.append({
-                    "Month": month.strftime("%b %Y"),
+                    "Month": i + 1,
                     "Duration": duration,
                     "Slot": slot,
                     "New Users": new_users,
@@ -76,41 +87,39 @@ def generate_forecast(slot_fees, slot_blocks):
 
         active_users = int(active_users * (1 + growth_rate))
 
-    return pd.DataFrame(forecast_data)
+    return compact_frame(pd.DataFrame(forecast_data))
 
-df = generate_forecast(slot_fees, slot_blocks)
+digest = canonical_digest([list(slot_fees), slot_fees, slot_blocks])
+df = generate_forecast(digest, slot_fees, slot_blocks)
 
 # -----------------------------
 # Display and Charts
 # -----------------------------
 st.subheader("📊 Forecast Table")
 st.dataframe(df)
+st.caption(f"{describe_footprint(df)} · Month 1 is {calendar['Period'].iat[0]}")
 
 st.subheader("📈 Forecast Charts")
 metric = st.selectbox("Select Metric for Chart", ["Fee Collected", "NII", "Profit"])
-chart_df = df.groupby("Month")[metric].sum().reset_index()
 
-fig, ax = plt.subplots()
-ax.plot(chart_df["Month"], chart_df[metric], label=metric)
-plt.xticks(rotation=45)
-plt.ylabel(metric)
-plt.title(f"{metric} Over Time")
-st.pyplot(fig)
+def draw_chart():
+    chart_df = df.groupby("Month")[metric].sum()
+    return line_chart_png(
+        months[chart_df.index.to_numpy() - 1], chart_df.to_numpy(), label=metric, ylabel=metric,
+        title=f"{metric} Over Time",
+    )
+
+# Drawn once per forecast and metric; the PNG is reused across reruns and sessions
+st.image(cached_chart(("v10", digest, metric), draw_chart))
 
 # -----------------------------
 # Excel Export
 # -----------------------------
 def export_forecast_excel(df):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name='Forecast', index=False)
-    output.seek(0)
-    return output
-
-if st.button("📥 Export to Excel"):
-    st.download_button(
+    # Streamed sheet by sheet in the background; rows past Excel's limit continue on "Forecast (2)"
+    excel_download(
+        {"Forecast": df, "Calendar": calendar}, frame_digest(df, calendar), "rosca_forecast_v10.xlsx",
         label="Download Excel File",
-        data=export_forecast_excel(df),
-        file_name="rosca_forecast_v10.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
+
+export_forecast_excel(df)
@@ -5,7 +5,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
+
+from rosca.export import frame_digest
+from rosca.rejoin import RejoinSchedule
+from rosca.rollup import period_summaries
+from rosca.schema import compact_frame, describe_footprint
+from rosca.ui import excel_download
 
 st.set_page_config(page_title="ROSCA Forecast App", layout="wide")
 st.title("ROSCA Forecast App - v6")
@@ -70,13 +75,13 @@ for d in durations:
 # === Forecast Engine ===
 forecast_months = 60
 user_base = [starting_users]
-rejoin_track = [0] * (forecast_months + 24)
+rejoin_track = RejoinSchedule(rest_period, forecast_months)
 records = []
 
 for m in range(1, forecast_months + 1):
     prev_users = user_base[-1]
     new_users = prev_users * (1 + monthly_growth / 100)
-    rejoining = rejoin_track[m] if m < len(rejoin_track) else 0
+    rejoining = rejoin_track[m]
     total_users = new_users + rejoining
     user_base.append(total_users)
 
@@ -91,8 +96,7 @@ for m in range(1, forecast_months + 1):
         users_d = total_users * (alloc[d] / 100)
         users_per_slab = users_d / len(slabs)
 
-        if m + d + rest_period < len(rejoin_track):
-            rejoin_track[m + d + rest_period] += users_d
+        rejoin_track.add(m + d, users_d)
 
         for slab in slabs:
             for slot in range(1, d + 1):
@@ -122,20 +126,22 @@ for m in range(1, forecast_months + 1):
                     "Rejoining Customers": rejoining if slot == 1 and slab == slabs[0] else 0
                 })
 
-df = pd.DataFrame(records)
-summary = df.groupby("Year")[["Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index()
+df = compact_frame(pd.DataFrame(records))
 
 # === UI Tabs ===
-tab1, tab2, tab3, tab4 = st.tabs(["Forecast", "Summary", "Charts", "Export"])
-with tab1:
-    st.dataframe(df)
-with tab2:
-    st.dataframe(summary)
-with tab3:
-    st.line_chart(df.groupby("Month")[["Fee Collected", "NII", "Profit"]].sum())
-with tab4:
-    excel = io.BytesIO()
-    with pd.ExcelWriter(excel, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Forecast")
-        summary.to_excel(writer, index=False, sheet_name="Summary")
-    st.download_button("Download Excel", excel.getvalue(), "rosca_forecast_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+tab1, tab2, tab3, tab4 = st.tabs(["Forecast", "Summary", "Charts", "Export"], key="view", on_change="rerun")
+if tab1.open:
+    with tab1:
+        st.dataframe(df)
+        st.caption(describe_footprint(df))
+else:
+    monthly, summary = period_summaries(df, ["Users", "Deposit", "Fee Collected", "NII", "Profit"])
+if tab2.open:
+    with tab2:
+        st.dataframe(summary)
+if tab3.open:
+    with tab3:
+        st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
+if tab4.open:
+    with tab4:
+        excel_download({"Forecast": df, "Summary": summary}, frame_digest(df, summary), "rosca_forecast_v6.xlsx", label="Download Excel")
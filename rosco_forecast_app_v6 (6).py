@@ -13,7 +13,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
+
+from rosca.export import frame_digest
+from rosca.rejoin import RejoinSchedule
+from rosca.rollup import period_summaries
+from rosca.schema import compact_frame, describe_footprint
+from rosca.ui import excel_download
 
 st.set_page_config(page_title="ROSCA Forecast App", layout="wide")
 st.title("ROSCA Forecast App - v6")
@@ -69,7 +74,7 @@ for d in durations:
 
 # Forecast Logic
 user_pool = [starting_users]
-rejoin_schedule = [0] * 100
+rejoin_schedule = RejoinSchedule(rest_period)
 records = []
 
 for m in range(1, 61):
@@ -89,8 +94,7 @@ for m in range(1, 61):
         users_d = total * (alloc[d] / 100)
         users_per_slab = users_d / len(slabs)
 
-        if m + d + rest_period < len(rejoin_schedule):
-            rejoin_schedule[m + d + rest_period] += users_d
+        rejoin_schedule.add(m + d, users_d)
 
         for slab in slabs:
             for slot in range(1, d + 1):
@@ -111,28 +115,28 @@ for m in range(1, 61):
                     "Profit": profit, "Rejoining Customers": rejoin if slot == 1 and slab == slabs[0] else 0
                 })
 
-df = pd.DataFrame(records)
+df = compact_frame(pd.DataFrame(records))
 
 # Summary View Fix
-if not df.empty and "Year" in df.columns:
-    summary = df.groupby("Year")[["Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-else:
-    summary = pd.DataFrame(columns=["Year", "Users", "Deposit", "Fee Collected", "NII", "Profit"])
+if df.empty:
     st.warning("No forecast data. Please configure allocations for at least one month.")
 
 # Tabs
-tab1, tab2, tab3, tab4 = st.tabs(["Forecast", "Summary", "Charts", "Export"])
-with tab1:
-    st.dataframe(df)
-with tab2:
-    st.dataframe(summary)
-with tab3:
-    if not df.empty:
-        st.line_chart(df.groupby("Month")[["Fee Collected", "NII", "Profit"]].sum())
-with tab4:
-    if not df.empty:
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-            df.to_excel(writer, sheet_name="Forecast", index=False)
-            summary.to_excel(writer, sheet_name="Summary", index=False)
-        st.download_button("Download Excel", buffer.getvalue(), "rosca_forecast_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+tab1, tab2, tab3, tab4 = st.tabs(["Forecast", "Summary", "Charts", "Export"], key="view", on_change="rerun")
+if tab1.open:
+    with tab1:
+        st.dataframe(df)
+        st.caption(describe_footprint(df))
+else:
+    monthly, summary = period_summaries(df, ["Users", "Deposit", "Fee Collected", "NII", "Profit"])
+if tab2.open:
+    with tab2:
+        st.dataframe(summary)
+if tab3.open:
+    with tab3:
+        if not df.empty:
+            st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
+if tab4.open:
+    with tab4:
+        if not df.empty:
+            excel_download({"Forecast": df, "Summary": summary}, frame_digest(df, summary), "rosca_forecast_v6.xlsx", label="Download Excel")
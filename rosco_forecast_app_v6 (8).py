@@ -11,7 +11,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
+
+from rosca.export import frame_digest
+from rosca.rejoin import RejoinSchedule
+from rosca.rollup import period_summaries
+from rosca.schema import compact_frame, describe_footprint
+from rosca.ui import excel_download
 
 st.set_page_config(page_title="ROSCA Forecast App", layout="wide")
 st.title("ROSCA Forecast App – v6")
@@ -63,7 +68,7 @@ for d in selected_durations:
 # === Calculations ===
 start_users = total_market * (tam_percent / 100) * (start_user_percent / 100)
 users_list = [start_users]
-rejoin_tracker = [0] * 100
+rejoin_tracker = RejoinSchedule(rest_period)
 rows = []
 
 for m in range(1, 61):
@@ -79,8 +84,7 @@ for m in range(1, 61):
         users_d = total_users * (duration_alloc[d] / 100)
         users_per_slab = users_d / len(slabs)
 
-        if m + d + rest_period < len(rejoin_tracker):
-            rejoin_tracker[m + d + rest_period] += users_d
+        rejoin_tracker.add(m + d, users_d)
 
         for slab in slabs:
             for slot in range(1, d + 1):
@@ -102,22 +106,24 @@ for m in range(1, 61):
                     "Rejoining Customers": rejoining if slot == 1 and slab == slabs[0] else 0
                 })
 
-df = pd.DataFrame(rows)
-summary = df.groupby("Year")[["Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index() if not df.empty else pd.DataFrame()
+df = compact_frame(pd.DataFrame(rows))
 
 # === Display ===
-tab1, tab2, tab3, tab4 = st.tabs(["Forecast", "Summary", "Charts", "Export"])
-with tab1:
-    st.dataframe(df)
-with tab2:
-    st.dataframe(summary)
-with tab3:
-    if not df.empty:
-        st.line_chart(df.groupby("Month")[["Fee Collected", "NII", "Profit"]].sum())
-with tab4:
-    if not df.empty:
-        out = io.BytesIO()
-        with pd.ExcelWriter(out, engine="xlsxwriter") as writer:
-            df.to_excel(writer, index=False, sheet_name="Forecast")
-            summary.to_excel(writer, index=False, sheet_name="Summary")
-        st.download_button("Download Excel", out.getvalue(), "rosca_forecast_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+tab1, tab2, tab3, tab4 = st.tabs(["Forecast", "Summary", "Charts", "Export"], key="view", on_change="rerun")
+if tab1.open:
+    with tab1:
+        st.dataframe(df)
+        st.caption(describe_footprint(df))
+else:
+    monthly, summary = period_summaries(df, ["Users", "Deposit", "Fee Collected", "NII", "Profit"])
+if tab2.open:
+    with tab2:
+        st.dataframe(summary)
+if tab3.open:
+    with tab3:
+        if not df.empty:
+            st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
+if tab4.open:
+    with tab4:
+        if not df.empty:
+            excel_download({"Forecast": df, "Summary": summary}, frame_digest(df, summary), "rosca_forecast_v6.xlsx", label="Download Excel")
@@ -1,11 +1,23 @@
 
 # ROSCA Forecast App v6 - Committee Forecasting System Implementation
-# ✅ Supports TAM, monthly + yearly growth, rejoining, rest, slot blocking, UI config, 60-month forecast, and Excel export
+# ✅ Supports TAM, monthly + yearly growth, rejoining, rest, slot blocking, UI config, 60–360 month forecast, and Excel export
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import io
+
+from rosca import COMMITTEE
+from rosca.ui import (
+    StageTimer,
+    cached_simulation,
+    cached_summaries,
+    columnar_download,
+    config_or_prompt,
+    excel_download,
+    forecast_stage,
+    live_model_download,
+    simulation_paths_input,
+    slot_table,
+    summary_view,
+)
 
 st.set_page_config(page_title="ROSCA Committee Forecast", layout="wide")
 st.title("ROSCA Committee Forecast App – v6")
@@ -17,6 +29,7 @@ tam = st.sidebar.number_input("TAM (Total Addressable Market)", value=2000000)
 start_pct = st.sidebar.slider("Starting % of TAM (Month 1)", 0, 100, 10)
 monthly_growth = st.sidebar.slider("Monthly Growth Rate (%)", 0.0, 10.0, 2.0)
 yearly_growth = st.sidebar.slider("Yearly Growth Rate (%)", 0.0, 20.0, 5.0)
+horizon = st.sidebar.slider("Forecast Horizon (months)", 12, 360, 60, step=12)
 
 start_users = tam * (start_pct / 100)
 rest_period = st.sidebar.slider("Rest Period After Committee (months)", 0, 12, 1)
@@ -25,6 +38,11 @@ fee_upfront = st.sidebar.radio("Fee Collected Upfront?", ["Yes", "No"]) == "Yes"
 kibor = st.sidebar.slider("KIBOR (%)", 0.0, 25.0, 11.0)
 spread = st.sidebar.slider("Spread (%)", 0.0, 20.0, 5.0)
 default_rate = st.sidebar.slider("Default Rate (%)", 0.0, 10.0, 1.0)
+monte_carlo = st.sidebar.checkbox("Simulate Default Risk (Monte Carlo)", value=False)
+if monte_carlo:
+    mc_dispersion = st.sidebar.slider("Default Correlation within Cohorts", 0.0, 0.2, 0.0, step=0.01)
+    mc_paths = simulation_paths_input(horizon, per_slot=mc_dispersion > 0)
+    mc_seed = st.sidebar.number_input("Random Seed", 0, 2**31 - 1, 42)
 
 # --- 2. Committee Duration Setup ---
 durations_all = [3, 4, 5, 6, 8, 10]
@@ -68,85 +86,63 @@ for d in selected_durations:
         slot_blocked[d][s] = col1.checkbox(f"Block S{s}", value=False, key=f"block_{d}_{s}")
         slot_fees[d][s] = col2.number_input(f"Fee% S{s}", 0, 100, max(0, 11 - s), key=f"fee_{d}_{s}")
 
-# --- Forecast Engine Variables ---
-monthly_users = []
-rejoin_schedule = [0] * 120
-records = []
-
-total_users = start_users
-current_users = start_users
-tam_cap = tam
-used_users = 0
-
-# --- 60-Month Forecast Loop ---
-for m in range(1, 61):
-    rejoining = rejoin_schedule[m]
-    growth_users = current_users * (monthly_growth / 100)
-
-    if m in [13, 25, 37, 49]:
-        growth_users += tam * (yearly_growth / 100)
-
-    # Avoid exceeding TAM cap
-    if used_users + growth_users > tam:
-        growth_users = max(0, tam - used_users)
-
-    current_users = growth_users + rejoining
-    used_users += growth_users
-    if current_users < 0:
-        current_users = 0
-
-    for d in selected_durations:
-        if duration_alloc[d] == 0: continue
-        users_d = current_users * (duration_alloc[d] / 100)
-
-        for slab in slabs:
-            if slab_alloc[d][slab] == 0: continue
-            slab_users = users_d * (slab_alloc[d][slab] / 100)
-            users_per_slot = slab_users
-
-            if m + d + rest_period < len(rejoin_schedule):
-                rejoin_schedule[m + d + rest_period] += slab_users
-
-            for slot in range(1, d + 1):
-                if slot_blocked[d][slot]:
-                    users = deposit = fee_col = nii = profit = fee = 0
-                else:
-                    users = users_per_slot
-                    deposit = users * slab * d
-                    fee = slot_fees[d][slot]
-                    fee_col = deposit * (fee / 100) if fee_upfront else 0
-                    nii = deposit * ((kibor + spread) / 100 / 12)
-                    profit = fee_col + nii - (deposit * default_rate / 100)
-
-                records.append({
-                    "Month": m, "Year": (m - 1) // 12 + 1,
-                    "Duration": d, "Slab": slab, "Slot": slot,
-                    "New Users": growth_users if slot == 1 and slab == slabs[0] else 0,
-                    "Rejoining Users": rejoining if slot == 1 and slab == slabs[0] else 0,
-                    "Active Users": users,
-                    "Deposit": deposit, "Fee %": fee,
-                    "Fee Collected": fee_col, "NII": nii, "Profit": profit,
-                    "Blocked": slot_blocked[d][slot]
-                })
-
-df = pd.DataFrame(records)
-monthly = df.groupby("Month")[["Active Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-yearly = df.groupby("Year")[["Active Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["Forecast", "Monthly Summary", "Yearly Summary", "Charts", "Export"])
-with tab1: st.dataframe(df)
-with tab2: st.dataframe(monthly)
-with tab3: st.dataframe(yearly)
-with tab4:
-    if not df.empty:
-        st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
-with tab5:
-    try:
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            df.to_excel(writer, sheet_name="Forecast", index=False)
-            monthly.to_excel(writer, sheet_name="Monthly", index=False)
-            yearly.to_excel(writer, sheet_name="Yearly", index=False)
-        st.download_button("📥 Download Excel", output.getvalue(), "rosco_forecast_committee_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    except:
-        st.error("❌ Install 'xlsxwriter' to enable export.")
+# --- Forecast over the selected horizon (vectorized engine) ---
+# Staged pipeline keyed on the validated config: a rate or fee change reuses
+# the cached user flows
+config = config_or_prompt(
+    tam=tam, start_users=start_users, monthly_growth=monthly_growth, yearly_growth=yearly_growth,
+    rest_period=rest_period, durations=selected_durations, slabs=slabs,
+    duration_alloc=duration_alloc, slab_alloc=slab_alloc, months=horizon, model=COMMITTEE,
+    slot_fees=slot_fees, slot_blocked=slot_blocked,
+    kibor=kibor, spread=spread, default_rate=default_rate, fee_upfront=fee_upfront,
+)
+if config is not None:
+    timer = StageTimer()
+    forecast = forecast_stage(config, timer)
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["Forecast", "Monthly Summary", "Yearly Summary", "Charts", "Export"], key="view", on_change="rerun",
+    )
+    if tab1.open:
+        with tab1:
+            with timer("table"):
+                slot_table(forecast, config)
+    else:
+        with timer("summaries"):
+            monthly, yearly = cached_summaries(forecast, config)
+    if tab2.open:
+        with tab2: summary_view(forecast, config, "Month", monthly)
+    if tab3.open:
+        with tab3: summary_view(forecast, config, "Year", yearly)
+    if tab4.open:
+        with tab4:
+            if forecast.n_rows:
+                st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
+                if monte_carlo:
+                    with timer("simulation"):
+                        simulation = cached_simulation(
+                            forecast, config, int(mc_paths), int(mc_seed), mc_dispersion,
+                        )
+                    st.subheader(f"Profit – P5 / P50 / P95 over {simulation.n_paths:,} paths")
+                    st.line_chart(simulation.bands("Profit").set_index("Month"))
+                    st.subheader("Loss from Default – P5 / P50 / P95")
+                    st.line_chart(simulation.bands("Loss from Default").set_index("Month"))
+    if tab5.open:
+        with tab5:
+            export_mode = st.radio(
+                "Export", ["Full data", "Live model (formulas)", "Parquet", "Arrow IPC (Feather)"], horizontal=True,
+            )
+            try:
+                with timer("export"):
+                    if export_mode == "Live model (formulas)":
+                        live_model_download(forecast, config, "rosco_forecast_committee_v6_model.xlsx")
+                    else:
+                        tables = {"Forecast": forecast.to_frame, "Monthly": monthly, "Yearly": yearly}
+                        if export_mode == "Full data":
+                            excel_download(tables, config.digest, "rosco_forecast_committee_v6.xlsx")
+                        else:
+                            fmt = "parquet" if export_mode == "Parquet" else "feather"
+                            columnar_download(tables, config.digest, fmt, f"rosco_forecast_committee_v6_{fmt}.zip")
+            except ImportError:
+                st.error("❌ Install 'xlsxwriter' (Excel) or 'pyarrow' (Parquet / Feather) to enable export.")
+
+    timer.show()
@@ -7,7 +7,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
+
+from rosca.export import frame_digest
+from rosca.rejoin import RejoinSchedule
+from rosca.rollup import period_summaries
+from rosca.schema import compact_frame, describe_footprint
+from rosca.ui import excel_download
 
 st.set_page_config(page_title="ROSCA Forecast App v6", layout="wide")
 st.title("ROSCA Forecast App – v6 (Fixed)")
@@ -66,7 +71,7 @@ for d in durations:
 # --- Forecast Logic ---
 initial_users = total_market * (tam_pct / 100) * (start_user_pct / 100)
 users_series = [initial_users]
-rejoin_schedule = [0] * 100
+rejoin_schedule = RejoinSchedule(rest_period)
 records = []
 
 for m in range(1, 61):
@@ -85,8 +90,7 @@ for m in range(1, 61):
                 continue
             slab_users = users_d * (slab_alloc[d][slab] / 100)
             users_per_slot = slab_users
-            if m + d + rest_period < len(rejoin_schedule):
-                rejoin_schedule[m + d + rest_period] += slab_users
+            rejoin_schedule.add(m + d, slab_users)
 
             for slot in range(1, d + 1):
                 if slot_block[d][slot]:
@@ -107,24 +111,31 @@ for m in range(1, 61):
                     "Rejoining Customers": rejoin if slot == 1 and slab == slabs[0] else 0
                 })
 
-df = pd.DataFrame(records)
-monthly = df.groupby("Month")[["Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-yearly = df.groupby("Year")[["Users", "Deposit", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["Forecast", "Monthly Summary", "Yearly Summary", "Charts", "Export"])
-with tab1: st.dataframe(df)
-with tab2: st.dataframe(monthly)
-with tab3: st.dataframe(yearly)
-with tab4:
-    if not df.empty:
-        st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
-with tab5:
-    try:
-        out = io.BytesIO()
-        with pd.ExcelWriter(out, engine="xlsxwriter") as writer:
-            df.to_excel(writer, index=False, sheet_name="Forecast")
-            monthly.to_excel(writer, index=False, sheet_name="Monthly")
-            yearly.to_excel(writer, index=False, sheet_name="Yearly")
-        st.download_button("Download Excel", out.getvalue(), "rosca_forecast_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    except ModuleNotFoundError:
-        st.error("📦 Install 'xlsxwriter' to enable Excel export. Run: pip install xlsxwriter")
+df = compact_frame(pd.DataFrame(records))
+
+tab1, tab2, tab3, tab4, tab5 = st.tabs(
+    ["Forecast", "Monthly Summary", "Yearly Summary", "Charts", "Export"], key="view", on_change="rerun",
+)
+if tab1.open:
+    with tab1:
+        st.dataframe(df)
+        st.caption(describe_footprint(df))
+else:
+    monthly, yearly = period_summaries(df, ["Users", "Deposit", "Fee Collected", "NII", "Profit"])
+if tab2.open:
+    with tab2: st.dataframe(monthly)
+if tab3.open:
+    with tab3: st.dataframe(yearly)
+if tab4.open:
+    with tab4:
+        if not df.empty:
+            st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
+if tab5.open:
+    with tab5:
+        try:
+            excel_download(
+                {"Forecast": df, "Monthly": monthly, "Yearly": yearly}, frame_digest(df, monthly, yearly),
+                "rosca_forecast_v6.xlsx", label="Download Excel",
+            )
+        except ModuleNotFoundError:
+            st.error("📦 Install 'xlsxwriter' to enable Excel export. Run: pip install xlsxwriter")
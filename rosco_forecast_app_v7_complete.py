@@ -8,9 +8,21 @@
 # ✅ MoM & YoY summaries, Excel export
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import io
+
+from rosca import LIFECYCLE
+from rosca.ui import (
+    StageTimer,
+    cached_simulation,
+    cached_summaries,
+    columnar_download,
+    config_or_prompt,
+    excel_download,
+    forecast_stage,
+    live_model_download,
+    simulation_paths_input,
+    slot_table,
+    summary_view,
+)
 
 st.set_page_config(page_title="ROSCA Forecast App v7", layout="wide")
 st.title("ROSCA Forecast App – v7: Lifecycle & Profit Logic")
@@ -22,6 +34,7 @@ tam = st.sidebar.number_input("TAM (Addressable Market)", value=2000000)
 start_pct = st.sidebar.slider("Starting % of TAM (Month 1)", 0, 100, 10)
 monthly_growth = st.sidebar.slider("Monthly Growth Rate (%)", 0.0, 10.0, 2.0)
 yearly_growth = st.sidebar.slider("Annual TAM Growth Multiplier (%)", 0.0, 20.0, 5.0)
+horizon = st.sidebar.slider("Forecast Horizon (months)", 12, 360, 60, step=12)
 
 # --- Config: Platform Logic
 rest_period = st.sidebar.slider("Rest Period (months)", 0, 12, 1)
@@ -30,6 +43,11 @@ fee_upfront = st.sidebar.radio("Fee Collected Upfront?", ["Yes", "No"]) == "Yes"
 kibor = st.sidebar.slider("KIBOR (%)", 0.0, 25.0, 11.0)
 spread = st.sidebar.slider("Spread (%)", 0.0, 20.0, 5.0)
 default_rate = st.sidebar.slider("Default Rate (%)", 0.0, 10.0, 1.0)
+monte_carlo = st.sidebar.checkbox("Simulate Default Risk (Monte Carlo)", value=False)
+if monte_carlo:
+    mc_dispersion = st.sidebar.slider("Default Correlation within Cohorts", 0.0, 0.2, 0.0, step=0.01)
+    mc_paths = simulation_paths_input(horizon, per_slot=mc_dispersion > 0)
+    mc_seed = st.sidebar.number_input("Random Seed", 0, 2**31 - 1, 42)
 
 # --- Committee Setup
 durations = list(range(2, 11))
@@ -75,73 +93,61 @@ for d in selected_durations:
 
 # --- Lifecycle Simulation
 start_users = tam * (start_pct / 100)
-records, rejoin_schedule = [], [0] * 120
-current_users = start_users
-total_users_used = start_users
-
-for m in range(1, 61):
-    year_bump = tam * (yearly_growth / 100) if m in [13, 25, 37, 49] else 0
-    growth_users = current_users * (monthly_growth / 100)
-    if total_users_used + growth_users + year_bump > tam:
-        growth_users = max(0, tam - total_users_used)
-    total_users_used += growth_users + year_bump
-
-    rejoining = rejoin_schedule[m]
-    active_users = growth_users + rejoining
-
-    for d in selected_durations:
-        if duration_alloc[d] == 0: continue
-        users_d = active_users * (duration_alloc[d] / 100)
-        for slab in slabs:
-            if slab_alloc[d][slab] == 0: continue
-            users_slab = users_d * (slab_alloc[d][slab] / 100)
-            if m + d + rest_period < len(rejoin_schedule):
-                rejoin_schedule[m + d + rest_period] += users_slab
 
-            for slot in range(1, d + 1):
-                if slot_blocked[d][slot]:
-                    u = deposit = fee_col = nii = profit = payout = refund = fee = 0
-                    state = "Blocked"
+# Staged pipeline keyed on the validated config: a rate or fee change reuses
+# the cached user flows
+config = config_or_prompt(
+    tam=tam, start_users=start_users, monthly_growth=monthly_growth, yearly_growth=yearly_growth,
+    rest_period=rest_period, durations=selected_durations, slabs=slabs,
+    duration_alloc=duration_alloc, slab_alloc=slab_alloc, months=horizon, model=LIFECYCLE,
+    slot_fees=slot_fees, slot_blocked=slot_blocked,
+    kibor=kibor, spread=spread, default_rate=default_rate, fee_upfront=fee_upfront,
+    default_fee_pct=default_fee_pct,
+)
+if config is not None:
+    timer = StageTimer()
+    forecast = forecast_stage(config, timer)
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["Forecast", "Monthly Summary", "Yearly Summary", "Charts", "Export"], key="view", on_change="rerun",
+    )
+    if tab1.open:
+        with tab1:
+            with timer("table"):
+                slot_table(forecast, config)
+    else:
+        with timer("summaries"):
+            monthly, yearly = cached_summaries(forecast, config)
+    if tab2.open:
+        with tab2: summary_view(forecast, config, "Month", monthly)
+    if tab3.open:
+        with tab3: summary_view(forecast, config, "Year", yearly)
+    if tab4.open:
+        with tab4:
+            if forecast.n_rows:
+                st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
+                if monte_carlo:
+                    with timer("simulation"):
+                        simulation = cached_simulation(
+                            forecast, config, int(mc_paths), int(mc_seed), mc_dispersion,
+                        )
+                    st.subheader(f"Profit – P5 / P50 / P95 over {simulation.n_paths:,} paths")
+                    st.line_chart(simulation.bands("Profit").set_index("Month"))
+                    st.subheader("Loss from Default – P5 / P50 / P95")
+                    st.line_chart(simulation.bands("Loss from Default").set_index("Month"))
+    if tab5.open:
+        with tab5:
+            export_mode = st.radio(
+                "Export", ["Full data", "Live model (formulas)", "Parquet", "Arrow IPC (Feather)"], horizontal=True,
+            )
+            with timer("export"):
+                if export_mode == "Live model (formulas)":
+                    live_model_download(forecast, config, "rosco_forecast_v7_model.xlsx")
                 else:
-                    u = users_slab
-                    fee = slot_fees[d][slot]
-                    deposit = u * slab * d
-                    payout = u * slab  # Assume lump sum at end
-                    fee_col = deposit * (fee / 100) if fee_upfront else payout * (fee / 100)
-                    nii = deposit * ((kibor + spread) / 100 / 12)
-                    loss = (payout * default_rate / 100)
-                    refund = deposit * (1 - default_fee_pct / 100) if m % d < 2 else 0
-                    profit = fee_col + nii - loss
-                    state = "Active"
-
-                records.append({
-                    "Month": m, "Year": (m - 1) // 12 + 1,
-                    "Duration": d, "Slab": slab, "Slot": slot,
-                    "New Users": growth_users if slot == 1 and slab == slabs[0] else 0,
-                    "Rejoining Users": rejoining if slot == 1 and slab == slabs[0] else 0,
-                    "State": state,
-                    "Users": u, "Deposit": deposit,
-                    "Payout": payout, "Fee %": fee,
-                    "Fee Collected": fee_col, "NII": nii,
-                    "Loss from Default": loss, "Refund": refund,
-                    "Profit": profit
-                })
-
-df = pd.DataFrame(records)
-monthly = df.groupby("Month")[["Users", "Deposit", "Payout", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-yearly = df.groupby("Year")[["Users", "Deposit", "Payout", "Fee Collected", "NII", "Profit"]].sum().reset_index()
-
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["Forecast", "Monthly Summary", "Yearly Summary", "Charts", "Export"])
-with tab1: st.dataframe(df)
-with tab2: st.dataframe(monthly)
-with tab3: st.dataframe(yearly)
-with tab4:
-    if not df.empty:
-        st.line_chart(monthly.set_index("Month")[["Fee Collected", "NII", "Profit"]])
-with tab5:
-    out = io.BytesIO()
-    with pd.ExcelWriter(out, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Forecast")
-        monthly.to_excel(writer, index=False, sheet_name="Monthly")
-        yearly.to_excel(writer, index=False, sheet_name="Yearly")
-    st.download_button("📥 Download Excel", out.getvalue(), "rosco_forecast_v7_full.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                    tables = {"Forecast": forecast.to_frame, "Monthly": monthly, "Yearly": yearly}
+                    if export_mode == "Full data":
+                        excel_download(tables, config.digest, "rosco_forecast_v7_full.xlsx")
+                    else:
+                        fmt = "parquet" if export_mode == "Parquet" else "feather"
+                        columnar_download(tables, config.digest, fmt, f"rosco_forecast_v7_{fmt}.zip")
+
+    timer.show()
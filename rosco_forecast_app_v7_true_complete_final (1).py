@@ -4,7 +4,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
+
+from rosca.cohorts import CohortLedger
+from rosca.export import frame_digest
+from rosca.ui import excel_download
 
 st.set_page_config(layout="wide")
 st.title("📊 ROSCA Forecast App v7 – Final Full Version")
@@ -28,23 +31,18 @@ start_users = int(tam * (start_pct / 100))
 growth_rate = monthly_growth / 100
 default_rate_pct = default_rate / 100
 
-months = 60
-results = []
-
-rejoin_schedule = [0] * (months + 20)
-rest_schedule = [0] * (months + 20)
+months = st.sidebar.number_input("Forecast Horizon (months)", 12, 360, 60)
+ledger = CohortLedger(months, dtype=np.int64)
 tam_used = start_users
 current_tam_base = start_users
-active_cohorts = []
+new_users = np.zeros(months, dtype=np.int64)
+rejoin_users = np.zeros(months, dtype=np.int64)
 
 # Month 1
-active_cohorts.append((1, 1 + 3 - 1, start_users, "NEW", 3))
-rest_schedule[1 + 3] += start_users
-rejoin_schedule[1 + 3 + rest_period] += start_users
+ledger.add(1, 3, start_users, "NEW", rest_period)
 
 for m in range(1, months + 1):
-    rejoin = rejoin_schedule[m]
-    rest = rest_schedule[m]
+    rejoin = ledger.rejoining_at(m)
 
     if m == 1:
         new = start_users
@@ -56,38 +54,33 @@ for m in range(1, months + 1):
 
     # Add new and rejoining users to cohort
     if new > 0:
-        active_cohorts.append((m, m + 3 - 1, new, "NEW", 3))
-        rest_schedule[m + 3] += new
-        rejoin_schedule[m + 3 + rest_period] += new
-
+        ledger.add(m, 3, new, "NEW", rest_period)
     if rejoin > 0:
-        active_cohorts.append((m, m + 3 - 1, rejoin, "REJOIN", 3))
-        rest_schedule[m + 3] += rejoin
-        rejoin_schedule[m + 3 + rest_period] += rejoin
+        ledger.add(m, 3, rejoin, "REJOIN", rest_period)
 
-    active = sum(c[2] for c in active_cohorts if c[0] <= m <= c[1])
-    pre_def = int(active * default_rate_pct * 0.5)
-    post_def = int(active * default_rate_pct * 0.5)
-    deposit = active * monthly_contribution
-    fee = active * monthly_contribution * (fee_percent / 100)
-    penalty_loss = pre_def * monthly_contribution * (1 - default_penalty / 100)
-    post_loss = post_def * monthly_contribution
-    profit = fee - (penalty_loss + post_loss)
+    new_users[m - 1] = new
+    rejoin_users[m - 1] = rejoin
 
-    results.append({
-        "Month": m,
-        "New Users": new,
-        "Rejoining Users": rejoin,
-        "Resting Users": rest,
-        "Active Users": active,
-        "Deposits": deposit,
-        "Defaults (Pre-Payout)": pre_def,
-        "Defaults (Post-Payout)": post_def,
-        "Fee Collected": fee,
-        "Profit": profit,
-    })
+# Monthly financials from the ledger's cumulative counts
+active = ledger.active()
+pre_def = np.trunc(active * default_rate_pct * 0.5).astype(np.int64)
+post_def = np.trunc(active * default_rate_pct * 0.5).astype(np.int64)
+fee = active * monthly_contribution * (fee_percent / 100)
+penalty_loss = pre_def * monthly_contribution * (1 - default_penalty / 100)
+post_loss = post_def * monthly_contribution
 
-df = pd.DataFrame(results)
+df = pd.DataFrame({
+    "Month": np.arange(1, months + 1),
+    "New Users": new_users,
+    "Rejoining Users": rejoin_users,
+    "Resting Users": ledger.resting(),
+    "Active Users": active,
+    "Deposits": active * monthly_contribution,
+    "Defaults (Pre-Payout)": pre_def,
+    "Defaults (Post-Payout)": post_def,
+    "Fee Collected": fee,
+    "Profit": fee - (penalty_loss + post_loss),
+})
 df["Year"] = df["Month"].apply(lambda x: (x - 1) // 12 + 1)
 df_yearly = df.groupby("Year")[["Active Users", "Deposits", "Fee Collected", "Profit"]].sum().reset_index()
 
@@ -101,15 +94,14 @@ st.dataframe(df_yearly)
 chart_opt = st.selectbox("📈 Select Metric", ["Deposits", "Fee Collected", "Profit", "Active Users"])
 st.line_chart(df.set_index("Month")[chart_opt])
 
-# Export Excel
+with st.expander("🔍 Cohort Drill-Down"):
+    drill_month = st.number_input("Month", 1, months, 1)
+    st.dataframe(pd.DataFrame(ledger.cohorts_active_in(drill_month),
+                              columns=["Start", "End", "Users", "Type", "Duration"]))
+
+# Export Excel – built only on request, in the background
 def export_excel(dataframes: dict, file_name: str):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        for sheet, data in dataframes.items():
-            data.to_excel(writer, index=False, sheet_name=sheet[:31])
-    output.seek(0)
-    st.download_button("📥 Download Excel", data=output, file_name=file_name,
-                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    excel_download(dataframes, frame_digest(*dataframes.values()), file_name)
 
 export_excel({
     "Forecast": df,
@@ -0,0 +1,39 @@
+# Shared fixtures: a small config that runs in milliseconds
+#
+#   python -m pytest -q
+#
+# bench_engine.py keeps the large timed configs; these tests cover the same
+# checks on a handful of durations and slabs.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rosca import COMMITTEE, LIFECYCLE  # noqa: E402
+
+SLABS = [1000, 5000, 20000]
+DURATIONS = [2, 3, 6]
+
+
+def small_config(**changes):
+    """Three durations and three slabs, one blocked slot; keywords override fields."""
+    config = dict(
+        tam=500000, start_users=20000, monthly_growth=4.0, yearly_growth=5.0,
+        rest_period=1, durations=DURATIONS, slabs=SLABS,
+        duration_alloc={2: 40, 3: 35, 6: 25},
+        slab_alloc={d: dict(zip(SLABS, [50, 30, 20])) for d in DURATIONS},
+        slot_fees={d: {s: max(0, 7 - s) for s in range(1, d + 1)} for d in DURATIONS},
+        slot_blocked={d: {s: (d == 3 and s == 3) for s in range(1, d + 1)} for d in DURATIONS},
+        kibor=11.0, spread=5.0, default_rate=1.0, fee_upfront=True, default_fee_pct=10.0,
+        months=24,
+    )
+    config.update(changes)
+    return config
+
+
+@pytest.fixture(params=[COMMITTEE, LIFECYCLE])
+def model(request):
+    return request.param
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from conftest import small_config
+from rosca import ForecastConfig, ResultCache, SharedResultCache, run_forecast
+from rosca import cache as cache_module
+
+
+def test_disk_roundtrip(tmp_path, model):
+    config = ForecastConfig(**small_config(model=model, rest_period={1: 0.5, 3: 0.5}))
+    cache = ResultCache(str(tmp_path))
+    assert cache.load(config) is None
+    computed = cache.get_or_compute(config, lambda: run_forecast(**config))
+    loaded = cache.load(config)
+    pd.testing.assert_frame_equal(loaded.to_frame(), computed.to_frame())
+    pd.testing.assert_frame_equal(loaded.monthly(), computed.monthly())
+    assert cache.stats()["entries"] == 1 and (cache.hits, cache.misses) == (1, 2)
+
+
+def test_disk_cache_ignores_other_versions(tmp_path):
+    config = ForecastConfig(**small_config())
+    ResultCache(str(tmp_path), version="old").save(config, run_forecast(**config))
+    assert ResultCache(str(tmp_path)).load(config) is None
+
+
+def test_disk_eviction_drops_oldest(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    configs = [ForecastConfig(**small_config(kibor=k)) for k in (10, 11, 12)]
+    for age, config in enumerate(configs):
+        cache.save(config, run_forecast(**config))
+        os.utime(cache.path(config.digest), (age, age))
+    size = cache.entries()[0][1]
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert cache.load(configs[0]) is None
+    assert cache.load(configs[2]) is not None
+
+
+def test_eviction_removes_stale_temp_files(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    stale, fresh = tmp_path / "stale.tmp", tmp_path / "fresh.tmp"
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    old = time.time() - cache_module.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+    cache.evict()
+    assert not stale.exists() and fresh.exists()
+
+
+def test_shared_lru_eviction():
+    cache = SharedResultCache(max_bytes=3000)
+    for key in "abc":
+        cache.put(key, np.zeros(100))   # 800 bytes each
+    cache.get("a")
+    cache.put("d", np.zeros(100))
+    assert "b" not in cache and all(key in cache for key in "acd")
+    assert cache.evictions == 1 and cache.bytes == 2400
+
+
+def test_shared_drops_oversize_values():
+    cache = SharedResultCache(max_bytes=1000)
+    cache.put("small", np.zeros(10))
+    big = np.zeros(1000)
+    assert cache.put("big", big) is big
+    assert "big" not in cache and "small" in cache
+
+
+def test_shared_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = SharedResultCache(ttl=10)
+    cache.put("a", b"x")
+    now[0] += 5
+    assert cache.get("a") == b"x"
+    now[0] += 6
+    assert "a" not in cache
+    assert cache.get("a") is None and cache.stats()["entries"] == 0
+
+
+def test_shared_get_or_compute_runs_once():
+    cache = SharedResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"value"
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=("key", compute)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and cache.get("key") == b"value"
@@ -0,0 +1,81 @@
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import small_config
+from rosca import MODEL_VERSION, ForecastConfig, ResultCache
+from rosca import cli
+
+
+@pytest.fixture
+def configs(tmp_path):
+    directory = tmp_path / "configs"
+    (directory / "nested").mkdir(parents=True)
+    (directory / "base.json").write_text(json.dumps(small_config()))
+    (directory / "nested" / "base.json").write_text(json.dumps(small_config(kibor=14)))
+    (directory / "notes.txt").write_text("not a config")
+    return directory
+
+
+def manifest(directory):
+    return json.loads((directory / cli.MANIFEST).read_text())
+
+
+def test_find_configs_and_run_names(configs):
+    paths = cli.find_configs([str(configs)])
+    assert [p.replace(str(configs), "") for p in paths] == ["/base.json", "/nested/base.json"]
+    assert cli._run_names(paths) == ["base", "base-2"]
+
+
+def test_run_writes_outputs_and_manifest(tmp_path, configs):
+    out = tmp_path / "out"
+    cache = ResultCache(str(tmp_path / "cache"))
+    result = cli.run_config(str(configs / "base.json"), str(out), ("parquet",), cache)
+    assert result["status"] == "computed" and result["rows"] > 0
+    entry = manifest(out)
+    assert entry["digest"] == ForecastConfig(**small_config()).digest
+    assert entry["model_version"] == MODEL_VERSION and entry["formats"] == ["parquet"]
+    assert len(pd.read_parquet(out / "forecast.parquet")) == entry["files"]["forecast.parquet"]
+
+    # Same config again: skipped; with the manifest's files gone or --force: served from the cache
+    assert cli.run_config(str(configs / "base.json"), str(out), ("parquet",), cache)["status"] == "unchanged"
+    assert cli.run_config(str(configs / "base.json"), str(out), ("parquet",), cache, force=True)["status"] == "cached"
+    (out / "forecast.parquet").unlink()
+    assert cli.run_config(str(configs / "base.json"), str(out), ("parquet",), cache)["status"] == "cached"
+
+
+def test_failed_run_is_recorded_and_batch_continues(tmp_path, configs, monkeypatch, capsys):
+    real = cli.write_results
+
+    def write_results(directory, forecast, config, formats):
+        if config.kibor == 14:
+            raise OSError("disk full")
+        return real(directory, forecast, config, formats)
+
+    monkeypatch.setattr(cli, "write_results", write_results)
+    out = tmp_path / "out"
+    code = cli.main([str(configs), "-o", str(out), "--no-cache"])
+    assert code == 1
+    assert manifest(out / "base")["files"]
+    failed = manifest(out / "base-2")
+    assert failed["status"] == "failed" and "disk full" in failed["error"]
+    assert "disk full" in capsys.readouterr().err
+
+    # A failed run is retried next time rather than skipped
+    monkeypatch.setattr(cli, "write_results", real)
+    assert cli.main([str(configs), "-o", str(out), "--no-cache"]) == 0
+    assert "error" not in manifest(out / "base-2")
+
+
+def test_invalid_config_fails_without_output(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps(small_config(kibor=-1)))
+    result = cli.run_config(str(path), str(tmp_path / "out"), ("parquet",))
+    assert result["status"] == "failed" and "rates must be non-negative" in result["error"]
+    assert not (tmp_path / "out").exists()
+
+
+def test_unknown_format_is_rejected(configs):
+    with pytest.raises(SystemExit):
+        cli.main([str(configs), "-f", "csv"])
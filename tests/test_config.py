@@ -0,0 +1,78 @@
+import json
+import pickle
+
+import pytest
+
+from conftest import small_config
+from rosca import ForecastConfig, canonical_digest, load_config
+
+
+def to_toml(config):
+    lines = []
+    tables = {}
+    for name, value in config.items():
+        if isinstance(value, dict):
+            tables[name] = value
+        else:
+            lines.append(f"{name} = {json.dumps(value)}")
+    for name, value in tables.items():
+        for key, inner in value.items():
+            if isinstance(inner, dict):
+                lines.append(f"[{name}.{key}]")
+                lines.extend(f'"{k}" = {json.dumps(v)}' for k, v in inner.items())
+            else:
+                lines.insert(0, f'{name}."{key}" = {json.dumps(inner)}')
+    return "\n".join(lines) + "\n"
+
+
+def test_digest_ignores_key_order_and_int_floats():
+    assert canonical_digest({1: 2, 3: 4}) == canonical_digest({3: 4.0, 1: 2.0})
+    assert canonical_digest([1, 2]) != canonical_digest([2, 1])
+    config = ForecastConfig(**small_config())
+    assert config.digest == ForecastConfig(**small_config(kibor=11)).digest
+    assert config.flows_digest == config.replace(kibor=14).flows_digest
+    assert config.digest != config.replace(kibor=14).digest
+
+
+def test_config_is_immutable_and_picklable():
+    config = ForecastConfig(**small_config())
+    with pytest.raises(AttributeError):
+        config.kibor = 12
+    assert pickle.loads(pickle.dumps(config)) == config
+    assert dict(config)["durations"] == (2, 3, 6)
+
+
+def test_validation_lists_every_problem():
+    cfg = small_config(start_users=-1, kibor=-2, duration_alloc={2: 40, 3: 35, 6: 20})
+    with pytest.raises(ValueError) as info:
+        ForecastConfig(**cfg)
+    message = str(info.value)
+    for problem in ("start users", "rates must be non-negative", "totals 95%"):
+        assert problem in message
+
+
+@pytest.mark.parametrize("extension", [".json", ".toml"])
+def test_load_config(tmp_path, extension):
+    cfg = small_config()
+    path = tmp_path / f"run{extension}"
+    path.write_text(json.dumps(cfg) if extension == ".json" else to_toml(cfg))
+    assert load_config(str(path)) == ForecastConfig(**cfg)
+
+
+@pytest.mark.parametrize("text, match", [
+    ('{"kibor": 1, "colour": "red"}', "unknown config keys"),
+    ("[1, 2]", "table of run_forecast keywords"),
+    ('{"kibor": 1}', "missing"),
+])
+def test_load_config_errors(tmp_path, text, match):
+    path = tmp_path / "bad.json"
+    path.write_text(text)
+    with pytest.raises(ValueError, match=match):
+        load_config(str(path))
+
+
+def test_load_config_rejects_other_extensions(tmp_path):
+    path = tmp_path / "run.yaml"
+    path.write_text("kibor: 1\n")
+    with pytest.raises(ValueError, match="expected a .json or .toml"):
+        load_config(str(path))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from bench_engine import check_equal, legacy_committee, legacy_lifecycle
+from conftest import small_config
+from rosca import COMMITTEE, LIFECYCLE, run_forecast
+from rosca.engine import MAX_DURATION, SUMMARY_COLUMNS, _single_flow_recurrence, flow_recurrence
+from rosca.rejoin import combined_kernel
+
+LEGACY = {COMMITTEE: legacy_committee, LIFECYCLE: legacy_lifecycle}
+
+
+def test_matches_legacy_loops(model):
+    # The legacy loops always run 60 months
+    cfg = small_config(months=60)
+    expected = LEGACY[model](**cfg)
+    forecast = run_forecast(model=model, **cfg)
+    check_equal(expected, forecast.to_frame())
+    columns = list(SUMMARY_COLUMNS[model])
+    for key, summary in (("Month", forecast.monthly()), ("Year", forecast.yearly())):
+        check_equal(expected.groupby(key)[columns].sum().reset_index(), summary)
+
+
+def test_take_matches_frame(model):
+    forecast = run_forecast(model=model, **small_config())
+    table = forecast.to_frame()
+    rows = np.array([0, 5, len(table) // 2, len(table) - 1])
+    check_equal(table.iloc[rows].reset_index(drop=True), forecast.take(rows))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_single_recurrence_matches_batch(model, seed):
+    rng = np.random.default_rng(seed)
+    kernel = combined_kernel([2, 5, 9], rng.dirichlet(np.ones(3)), int(rng.integers(0, 6)))
+    growth = rng.uniform(0, 0.08, 2)
+    args = (model, float(rng.uniform(1e5, 1e6)), float(rng.uniform(1e3, 5e4)))
+    batch = flow_recurrence(*args, growth, 5000.0, np.vstack([kernel, kernel]), 48)
+    single = _single_flow_recurrence(*args, float(growth[0]), 5000.0, kernel, 48)
+    for b, s in zip(batch, single):
+        np.testing.assert_array_equal(b[0], s)
+
+
+def test_update_slots_matches_rerun(model):
+    cfg = small_config()
+    forecast = run_forecast(model=model, **cfg)
+    forecast.monthly_totals()
+    fees = {d: dict(slots) for d, slots in cfg["slot_fees"].items()}
+    blocked = {d: dict(slots) for d, slots in cfg["slot_blocked"].items()}
+    fees[6][2], blocked[2][1], blocked[3][3] = 7.5, True, False
+    patched = forecast.update_slots(slot_fees={6: {2: 7.5}}, slot_blocked={2: {1: True}, 3: {3: False}})
+    expected = run_forecast(model=model, **dict(cfg, slot_fees=fees, slot_blocked=blocked))
+    for name, values in expected.monthly_totals().items():
+        np.testing.assert_allclose(patched.monthly_totals()[name], values, rtol=1e-12)
+    check_equal(expected.to_frame(), patched.to_frame())
+
+
+def test_update_slots_rejects_unknown_slots():
+    forecast = run_forecast(**small_config())
+    with pytest.raises(ValueError, match="not part of this forecast"):
+        forecast.update_slots(slot_fees={4: {1: 1.0}})
+    with pytest.raises(ValueError, match="no slot 4"):
+        forecast.update_slots(slot_blocked={3: {4: True}})
+
+
+def test_rejects_durations_past_max():
+    d = MAX_DURATION + 1
+    cfg = small_config(
+        durations=[d], duration_alloc={d: 100}, slab_alloc={d: {1000: 100, 5000: 0, 20000: 0}},
+        slot_fees={d: {s: 0 for s in range(1, d + 1)}}, slot_blocked={d: {s: False for s in range(1, d + 1)}},
+    )
+    with pytest.raises(ValueError):
+        run_forecast(**cfg)
@@ -0,0 +1,60 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import small_config
+from rosca import run_forecast
+from rosca.export import forecast_tables, workbook_bytes, write_workbook
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return forecast_tables(run_forecast(**small_config(months=12)))
+
+
+def test_workbook_splits_long_sheets(tmp_path, tables):
+    openpyxl = pytest.importorskip("openpyxl")
+    table = tables["Forecast"]
+    path = tmp_path / "forecast.xlsx"
+    calls = []
+    written = write_workbook(str(path), {"Forecast": table}, progress=lambda *a: calls.append(a),
+                             chunk_rows=40, max_rows=151)
+    assert len(table) > 300
+    assert written == {"Forecast": 150, "Forecast (2)": 150, "Forecast (3)": len(table) - 300}
+    assert calls[-1][0] == 1.0
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    rows = [row for name in written for row in workbook[name].iter_rows(min_row=2, values_only=True)]
+    header = next(workbook["Forecast (2)"].iter_rows(max_row=1, values_only=True))
+    assert list(header) == list(table.columns)
+    np.testing.assert_allclose([row[header.index("Profit")] for row in rows], table["Profit"])
+
+
+def test_workbook_bytes(tables):
+    pytest.importorskip("openpyxl")
+    data, written = workbook_bytes(tables)
+    assert written == {name: len(table) for name, table in tables.items()}
+    monthly = pd.read_excel(io.BytesIO(data), sheet_name="Monthly", engine="openpyxl")
+    pd.testing.assert_frame_equal(monthly, tables["Monthly"], check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_columnar_roundtrip(tmp_path, tables, fmt):
+    pytest.importorskip("pyarrow")
+    from rosca.export import columnar_bytes, write_tables
+
+    written = write_tables(str(tmp_path), tables, fmt)
+    read = pd.read_parquet if fmt == "parquet" else pd.read_feather
+    path = next(p for p in written if "forecast" in p)
+    loaded = read(path)
+    expected = tables["Forecast"]
+    assert list(loaded.columns) == list(expected.columns) and len(loaded) == len(expected)
+    np.testing.assert_array_equal(loaded["Profit"], expected["Profit"])
+    np.testing.assert_array_equal(loaded["Slot"].astype(int), expected["Slot"].astype(int))
+
+    data, rows = columnar_bytes(tables, fmt)
+    assert rows == {name: len(table) for name, table in tables.items()}
+    assert len(zipfile.ZipFile(io.BytesIO(data)).namelist()) == len(tables)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from conftest import small_config
+from rosca import run_forecast, simulate_defaults
+from rosca.montecarlo import _cohort_inputs
+
+
+@pytest.fixture(scope="module")
+def forecast():
+    return run_forecast(**small_config(default_rate=3.0))
+
+
+def test_seed_fixes_paths(forecast):
+    first = simulate_defaults(forecast, paths=300, seed=3, chunk_paths=100)
+    again = simulate_defaults(forecast, paths=300, seed=3, chunk_paths=100)
+    np.testing.assert_array_equal(first.loss, again.loss)
+    assert not np.array_equal(first.loss, simulate_defaults(forecast, paths=300, seed=4, chunk_paths=100).loss)
+
+
+@pytest.mark.parametrize("dispersion", [0.0, 0.05])
+def test_mean_loss_tracks_forecast(forecast, dispersion):
+    sim = simulate_defaults(forecast, paths=2000, seed=7, dispersion=dispersion)
+    expected = forecast.monthly_totals()["Loss from Default"]
+    np.testing.assert_allclose(sim.loss.sum(axis=1).mean(), expected.sum(), rtol=0.02)
+    np.testing.assert_allclose(sim.profit + sim.loss, (sim.profit + sim.loss)[:1].repeat(sim.n_paths, 0))
+
+
+def test_dispersion_widens_bands(forecast):
+    plain = simulate_defaults(forecast, paths=1000, seed=1).loss.sum(axis=1)
+    spread = simulate_defaults(forecast, paths=1000, seed=1, dispersion=0.1).loss.sum(axis=1)
+    assert spread.std() > 2 * plain.std()
+
+
+def test_per_slot_draws_split_pooled_members(forecast):
+    pooled, pooled_loss = _cohort_inputs(forecast)
+    slots, slot_loss = _cohort_inputs(forecast, per_slot=True)
+    open_slots = int(forecast.slot_open.sum())
+    assert slots.shape[1] == open_slots * len(small_config()["slabs"])
+    np.testing.assert_array_equal(slots.sum(axis=1), pooled.sum(axis=1))
+    np.testing.assert_allclose((slots * slot_loss).sum(axis=1), (pooled * pooled_loss).sum(axis=1))
+
+
+def test_streaming_stats_without_paths(forecast):
+    kept = simulate_defaults(forecast, paths=500, seed=2)
+    streamed = simulate_defaults(forecast, paths=500, seed=2, keep_paths=False)
+    assert streamed.loss is None and streamed.n_paths == 500
+    np.testing.assert_allclose(streamed.stats.moments["Profit"].mean, kept.profit.mean(axis=0), rtol=1e-9)
+    extremes = streamed.stats.extremes_frame("Loss from Default")
+    np.testing.assert_array_equal(extremes["Max"], kept.loss.max(axis=0))
+    np.testing.assert_array_equal(extremes["Max Path"], kept.loss.argmax(axis=0))
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import small_config
+from rosca import RollupCube, period_summaries, run_forecast
+
+BREAKDOWNS = [("Month",), ("Year",), ("Duration",), ("Year", "Duration"), ("Month", "Slab", "Slot"),
+              ("Duration", "Slab")]
+
+
+@pytest.fixture
+def forecast(model):
+    return run_forecast(model=model, **small_config())
+
+
+def assert_matches_groupby(breakdown, table, by, metrics):
+    expected = table.groupby(list(by), observed=True)[metrics].sum().reset_index()
+    # Only combinations present in the table are listed
+    assert len(breakdown) == len(expected)
+    merged = breakdown.merge(expected, on=list(by), suffixes=("", " expected"), how="left")
+    for name in metrics:
+        np.testing.assert_allclose(merged[name], merged[f"{name} expected"], rtol=1e-9, atol=1e-6, err_msg=name)
+
+
+@pytest.mark.parametrize("by", BREAKDOWNS)
+def test_cube_matches_groupby(forecast, by):
+    cube = RollupCube.from_forecast(forecast, month_chunk=5)
+    assert_matches_groupby(cube.frame(by), forecast.to_frame(), by, list(cube.metrics))
+
+
+@pytest.mark.parametrize("by", [("Month",), ("Year",), ("Duration", "Slot")])
+def test_frame_cube_matches_groupby(forecast, by):
+    table = forecast.to_frame()
+    cube = RollupCube.from_frame(table, ["Profit", "Fee Collected"])
+    assert_matches_groupby(cube.frame(by), table, by, ["Profit", "Fee Collected"])
+
+
+def test_breakdown_skips_impossible_slots(forecast):
+    # A 2-month committee has no slot 6
+    breakdown = RollupCube.from_forecast(forecast).frame(("Duration", "Slot"))
+    assert not ((breakdown["Duration"] == 2) & (breakdown["Slot"] > 2)).any()
+    assert len(breakdown) == sum(small_config()["durations"])
+
+
+def test_total(forecast):
+    cube = RollupCube.from_forecast(forecast)
+    table = forecast.to_frame()
+    expected = table.loc[(table["Month"] == 7) & (table["Duration"] == 6), "Profit"].sum()
+    assert cube.total("Profit", Month=7, Duration=6) == pytest.approx(expected)
+    with pytest.raises(KeyError):
+        cube.total("Profit", Duration=4)
+
+
+def test_period_summaries(forecast):
+    table = forecast.to_frame()
+    monthly, yearly = period_summaries(table, ["Profit"])
+    assert_matches_groupby(monthly, table, ("Month",), ["Profit"])
+    assert_matches_groupby(yearly, table, ("Year",), ["Profit"])
+
+
+def test_period_summaries_empty_table():
+    monthly, yearly = period_summaries(pd.DataFrame(columns=["Month", "Year", "Profit"]), ["Profit"])
+    assert list(monthly.columns) == ["Month", "Profit"] and monthly.empty
+    assert list(yearly.columns) == ["Year", "Profit"] and yearly.empty
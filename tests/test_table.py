@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from bench_engine import check_equal
+from conftest import small_config
+from rosca import run_forecast
+from rosca.table import TableView
+
+FILTERS = [
+    {},
+    {"months": (5, 9)},
+    {"durations": [3, 6], "slabs": [5000]},
+    {"slots": [1, 3], "blocked": False},
+    {"blocked": True},
+    {"months": (30, 40)},
+]
+
+
+@pytest.fixture(scope="module")
+def forecast():
+    return run_forecast(**small_config())
+
+
+def filtered(table, months=None, durations=None, slabs=None, slots=None, blocked=None):
+    keep = np.ones(len(table), dtype=bool)
+    if months:
+        keep &= table["Month"].between(*months).to_numpy()
+    for column, allowed in (("Duration", durations), ("Slab", slabs), ("Slot", slots)):
+        if allowed:
+            keep &= table[column].isin(allowed).to_numpy()
+    if blocked is not None:
+        keep &= table["Blocked"].to_numpy() == blocked
+    return table[keep].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pages_match_filtered_table(forecast, filters):
+    expected = filtered(forecast.to_frame(), **filters)
+    view = TableView(forecast, **filters)
+    assert len(view) == len(expected)
+    size = 50
+    assert view.n_pages(size) == -(-len(expected) // size)
+    for number in range(view.n_pages(size)):
+        check_equal(expected.iloc[number * size:(number + 1) * size].reset_index(drop=True), view.page(number, size))
+
+
+def test_sorted_pages(forecast):
+    view = TableView(forecast, durations=[6])
+    view.order = view.sort_order("Profit", descending=True)
+    expected = filtered(forecast.to_frame(), durations=[6]).sort_values("Profit", ascending=False, kind="stable")
+    check_equal(expected.iloc[20:40].reset_index(drop=True), view.page(1, 20))
+
+
+def test_key_ignores_filter_order(forecast):
+    assert TableView(forecast, durations=[6, 3]).key == TableView(forecast, durations=[3, 6]).key